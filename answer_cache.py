@@ -0,0 +1,168 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------
+# Two-tier answer cache
+#
+# In-process LRU in front of a SQLite file shared by every gunicorn worker.
+# Entries are keyed on (knowledge version, folded query), so a change to
+# the knowledge JSON makes every older entry unreachable and it is purged.
+# -------------------------
+
+PUNCT_RE = re.compile(r'[^\w\s]+')
+SPACE_RE = re.compile(r'\s+')
+
+
+def fold_query(text):
+    # Case, punctuation and whitespace insensitive cache key
+    return SPACE_RE.sub(' ', PUNCT_RE.sub(' ', text.lower())).strip()
+
+
+def fingerprint_files(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            digest.update(b'missing:' + path.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class AnswerCache:
+    def __init__(self, path, version, ttl=24 * 3600, max_entries=5000, memory_entries=512):
+        self.path = path
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {'memory_hits': 0, 'sqlite_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'errors': 0}
+        self._sqlite(self._setup)
+
+    # -------------------------
+    # SQLite tier
+    # -------------------------
+    def _connection(self):
+        # Per thread and per process: a connection opened before a fork
+        # (gunicorn --preload) must not be used by the child
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _sqlite(self, operation, *args):
+        # The shared tier is best effort; failures degrade to memory-only
+        if not self.path:
+            return None
+        try:
+            return operation(self._connection(), *args)
+        except sqlite3.Error as e:
+            self.counters['errors'] += 1
+            print(f"Answer cache error: {str(e)}")
+            return None
+
+    def _setup(self, conn):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "version TEXT, key TEXT, answer TEXT, created REAL, accessed REAL, "
+            "PRIMARY KEY (version, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed)")
+        # Entries from an older knowledge version can never be read again
+        conn.execute("DELETE FROM answers WHERE version != ?", (self.version,))
+
+    def _load(self, conn, key, now):
+        row = conn.execute(
+            "SELECT answer, created FROM answers WHERE version = ? AND key = ?", (self.version, key)
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > self.ttl:
+            conn.execute("DELETE FROM answers WHERE version = ? AND key = ?", (self.version, key))
+            self.counters['evictions'] += 1
+            return None
+        conn.execute("UPDATE answers SET accessed = ? WHERE version = ? AND key = ?", (now, self.version, key))
+        return row
+
+    def _save(self, conn, key, answer, now):
+        conn.execute(
+            "INSERT OR REPLACE INTO answers (version, key, answer, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (self.version, key, answer, now, now),
+        )
+        excess = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM answers WHERE rowid IN (SELECT rowid FROM answers ORDER BY accessed LIMIT ?)", (excess,)
+            )
+            self.counters['evictions'] += excess
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def get(self, query):
+        key = fold_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.counters['memory_hits'] += 1
+                    return entry[0]
+                del self._memory[key]
+                self.counters['evictions'] += 1
+        row = self._sqlite(self._load, key, now)
+        if row is None:
+            self.counters['misses'] += 1
+            return None
+        self.counters['sqlite_hits'] += 1
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, query, answer):
+        key = fold_query(query)
+        now = time.time()
+        self._remember(key, answer, now)
+        self._sqlite(self._save, key, answer, now)
+        self.counters['stores'] += 1
+
+    def _remember(self, key, answer, created):
+        with self._lock:
+            self._memory[key] = (answer, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def set_version(self, version):
+        # Called when the knowledge files change
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            self._memory.clear()
+        self._sqlite(self._setup)
+
+    def stats(self):
+        hits = self.counters['memory_hits'] + self.counters['sqlite_hits']
+        lookups = hits + self.counters['misses']
+        shared = self._sqlite(lambda conn: conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0])
+        return {
+            **self.counters,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'sqlite_entries': shared,
+            'version': self.version,
+            'pid': os.getpid(),
+        }
@@ -0,0 +1,127 @@
+import math
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from retrieval import tokenize
+
+# -------------------------
+# Local quiz answer scoring
+#
+# Answers are graded against their reference answer without a model call.
+# Term weights are TF-IDF, with IDF fitted on the knowledge passages, so
+# common words ("the", "company") count for little and product or
+# ingredient names count for a lot. Character trigrams of every word are
+# features as well, so typos and inflections still overlap. Each pair
+# gets two signals:
+#   similarity: cosine of the two TF-IDF vectors
+#   coverage:   IDF weight of the reference words the answer mentions,
+#               relative to the weight of the reference's top key terms
+#               (naming any KEY_TERMS of its words earns full coverage)
+# A whole quiz is scored at once: the batch is laid out as
+# (answers x terms) matrices over the terms it actually uses, and both
+# signals are a row-wise product and sum.
+# -------------------------
+
+SUFFIX_RE = re.compile(r'(?:ing|ed|es|s|ly)$')
+TRIGRAM_WEIGHT = 0.5  # A trigram counts half as much as a whole word
+KEY_TERMS = 8
+FULL_MARKS = 0.6  # Blend at which an answer scores 1.0
+
+
+def stem(word):
+    # Light suffix stripping, enough for "products"/"product", "treated"/"treat"
+    return SUFFIX_RE.sub('', word) if len(word) > 4 else word
+
+
+def trigrams(word):
+    padded = f"<{word}>"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def features(text):
+    # Word stems plus their character trigrams, e.g. {"w:acne": 1, "#acn": 1, ...}
+    counts = {}
+    for word in tokenize(text):
+        word = stem(word)
+        counts[f"w:{word}"] = counts.get(f"w:{word}", 0) + 1
+        for gram in trigrams(word):
+            counts[f"#{gram}"] = counts.get(f"#{gram}", 0) + TRIGRAM_WEIGHT
+    return counts
+
+
+class AnswerScorer:
+    def __init__(self, passages, key_terms=KEY_TERMS, full_marks=FULL_MARKS):
+        # passages: texts the IDF is fitted on (the chunked knowledge files)
+        self.key_terms = key_terms
+        self.full_marks = full_marks
+        df = {}
+        for text in passages:
+            for term in features(text):
+                df[term] = df.get(term, 0) + 1
+        n_docs = max(len(passages), 1)
+        self.idf = {term: math.log((1 + n_docs) / (1 + count)) + 1 for term, count in df.items()}
+        # Terms the knowledge never mentions are treated as rare
+        self.default_idf = math.log(1 + n_docs) + 1
+        # Reference answers repeat (pool questions), so their vectors are kept
+        self.reference_vector = lru_cache(maxsize=2048)(self._reference_vector)
+
+    def weights(self, text):
+        # {term: tf-idf weight}
+        return {term: tf * self.idf.get(term, self.default_idf) for term, tf in features(text).items()}
+
+    def _reference_vector(self, text):
+        # -> (weights, word terms, weight of the top key_terms words)
+        weights = self.weights(text)
+        words = tuple(t for t in weights if t.startswith('w:'))
+        top = sorted((weights[t] for t in words), reverse=True)[:self.key_terms]
+        return weights, words, sum(top)
+
+    def score_many(self, pairs):
+        # pairs: [(reference, answer), ...] -> [{'score', 'similarity', 'coverage'}, ...]
+        if not pairs:
+            return []
+        columns = {}
+        references, answers, words, key_mass = [], [], [], []
+        for reference, answer in pairs:
+            ref_weights, ref_words, mass = self.reference_vector(reference or '')
+            references.append(ref_weights)
+            answers.append(self.weights(answer or ''))
+            words.append(ref_words)
+            key_mass.append(mass)
+            for term in ref_weights:
+                columns.setdefault(term, len(columns))
+
+        # Answer terms absent from the reference add to its norm only, so
+        # they are summed per row instead of getting columns
+        shape = (len(pairs), max(len(columns), 1))
+        ref_matrix = np.zeros(shape, dtype=np.float32)
+        answer_matrix = np.zeros(shape, dtype=np.float32)
+        word_matrix = np.zeros(shape, dtype=np.float32)
+        answer_norms = np.zeros(len(pairs), dtype=np.float32)
+        for row, (ref_weights, answer_weights, ref_words) in enumerate(zip(references, answers, words)):
+            for term, weight in ref_weights.items():
+                ref_matrix[row, columns[term]] = weight
+            for term in ref_words:
+                word_matrix[row, columns[term]] = ref_weights[term]
+            for term, weight in answer_weights.items():
+                answer_norms[row] += weight * weight
+                column = columns.get(term)
+                if column is not None:
+                    answer_matrix[row, column] = weight
+
+        dot = (ref_matrix * answer_matrix).sum(axis=1)
+        norms = np.sqrt((ref_matrix * ref_matrix).sum(axis=1) * answer_norms)
+        similarity = np.divide(dot, norms, out=np.zeros_like(dot), where=norms > 0)
+        key_mass = np.array(key_mass, dtype=np.float32)
+        covered = (word_matrix * (answer_matrix > 0)).sum(axis=1)
+        coverage = np.minimum(np.divide(covered, key_mass, out=np.zeros_like(covered), where=key_mass > 0), 1.0)
+        scores = np.clip((similarity + coverage) / 2 / self.full_marks, 0.0, 1.0)
+        return [
+            {'score': round(float(s), 2), 'similarity': round(float(sim), 3), 'coverage': round(float(cov), 3)}
+            for s, sim, cov in zip(scores, similarity, coverage)
+        ]
+
+    def score(self, reference, answer):
+        return self.score_many([(reference, answer)])[0]
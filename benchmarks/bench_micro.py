@@ -0,0 +1,82 @@
+import argparse
+import os
+import time
+
+from common import REPO_ROOT, compare, query_corpus, save_results, summarize
+from knowledge_index import search_json
+
+# -------------------------
+# Microbenchmarks for the per-message hot path, over a realistic query
+# corpus (see common.query_corpus). Imports the real app with model calls
+# disabled; nothing here touches the network.
+#
+#   python benchmarks/bench_micro.py [--queries 500] [--repeat 3] [--compare results/micro-....json]
+# -------------------------
+
+os.environ.setdefault('GOOGLE_API_KEY', 'benchmark')
+os.environ.setdefault('ANSWER_CACHE_PATH', '')
+os.environ.setdefault('KNOWLEDGE_RELOAD_INTERVAL', '0')
+os.environ.setdefault('MODEL_WARMUP', '0')
+os.chdir(REPO_ROOT)
+
+
+def run(fn, corpus, repeat):
+    # Per-call latencies (seconds); best of `repeat` passes per query
+    # to keep scheduler noise out of the percentiles
+    samples = []
+    for query in corpus:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(query)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None or elapsed < best else best
+        samples.append(best)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot path microbenchmarks")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', default=None, help="Earlier result file to compare p50 against")
+    parser.add_argument('--out', default=None)
+    args = parser.parse_args()
+
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    knowledge = app.knowledge_store.current
+    corpus = query_corpus(args.queries)
+    corrected = [app.correct_spelling(q) for q in corpus]
+    # Five passages stand in for a quiz's reference answers, each query for the user's answers
+    references = [knowledge.context_retriever.texts[i] for i in range(5)]
+
+    benchmarks = {
+        'search_json (reference)': (lambda q: search_json(knowledge.data, q), corrected),
+        'KnowledgeIndex.search': (knowledge.knowledge_index.search, corrected),
+        'generate_answer_from_json': (app.generate_answer_from_json, corrected),
+        'correct_spelling': (app.correct_spelling, corpus),
+        'catalog_answer': (app.catalog_answer, corrected),
+        'context select': (lambda q: knowledge.context_retriever.select(q, app.CONTEXT_TOKEN_BUDGET, app.CONTEXT_TOP_K),
+                           corrected),
+        'score quiz (5 answers)': (lambda q: knowledge.answer_scorer.score_many([(r, q) for r in references]), corpus),
+    }
+
+    results = {}
+    print(f"{len(corpus)} queries, best of {args.repeat} per query (µs)")
+    print(f"  {'benchmark':28s} {'mean':>9s} {'p50':>9s} {'p95':>9s} {'p99':>9s}")
+    for name, (fn, queries) in benchmarks.items():
+        stats = summarize(run(fn, queries, args.repeat), scale=1e6)
+        results[name] = stats
+        print(f"  {name:28s} {stats['mean']:9.1f} {stats['p50']:9.1f} {stats['p95']:9.1f} {stats['p99']:9.1f}")
+
+    path = save_results('micro', {'queries': args.queries, 'repeat': args.repeat, 'unit': 'us'}, results, args.out)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(args.compare, results, 'p50')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scrape_ubik  # noqa: E402
+
+# -------------------------
+# Page extraction benchmark: single-pass parse_page vs the old multi-pass
+# extractor, over saved HTML (scrape_ubik.py --save-html DIR) or, without a
+# directory, over generated WooCommerce-style category pages.
+#
+#   python benchmarks/bench_scrape.py [html_dir] [--repeat N]
+# -------------------------
+
+
+def generated_pages(count=5, products=60, sections=40):
+    pages = []
+    for n in range(count):
+        parts = ['<html><head><title>Anti-Acne Archives - Ubik</title>'
+                 '<meta name="description" content="Dermatology products"><script>var a = 1;</script></head><body>'
+                 '<nav class="menu"><a href="/">Home</a><a href="/services/">Services</a></nav><ul class="products">']
+        for i in range(products):
+            parts.append(
+                f'<li class="product type-product"><a href="/product/p{n}-{i}/">'
+                f'<h2 class="woocommerce-loop-product__title">Product {i} Gel 20 gm</h2></a>'
+                f'<div class="woocommerce-product-details__short-description"><p>Gel <b>number</b> {i}.</p></div>'
+                f'<span class="price"><span class="woocommerce-Price-amount amount"><bdi>&#8377;{100 + i}</bdi></span></span>'
+                f'<div class="key-ingredients"><ul><li>Azelaic Acid</li><li>Niacinamide</li></ul></div></li>')
+        parts.append('</ul>')
+        for j in range(sections):
+            parts.append(
+                f'<section class="service-block"><h3 class="service-title">Service {j}</h3>'
+                f'<div class="content"><div><p>Paragraph {j} <span>with <em>nested</em> markup</span>.</p>'
+                f'<ul><li>one</li><li>two</li></ul></div></div><ul class="features"><li>Feature</li></ul></section>')
+        parts.append('<a class="next page-numbers" href="/product-category/anti-acne/page/2/">Next</a>'
+                     '<div class="footer-info">Call +91 9512355550 or mail care@ubiksolutionspvtltd.com</div></body></html>')
+        pages.append((f"generated-{n}", ''.join(parts)))
+    return pages
+
+
+def saved_pages(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def best_of(fn, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, html in pages:
+            fn(scrape_ubik.base_url + '/product-category/anti-acne/', html)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv):
+    repeat = 5
+    if '--repeat' in argv:
+        index = argv.index('--repeat')
+        repeat = int(argv[index + 1])
+        argv = argv[:index] + argv[index + 2:]
+    pages = saved_pages(argv[0]) if argv else generated_pages()
+    size = sum(len(html) for _, html in pages) / 1024
+
+    results = [('multi-pass (html.parser)', best_of(scrape_ubik.parse_page_multipass, pages, repeat))]
+    if scrape_ubik.lxml is not None:
+        results.append(('single-pass (lxml)', best_of(scrape_ubik.parse_page, pages, repeat)))
+    lxml_module, scrape_ubik.lxml = scrape_ubik.lxml, None
+    try:
+        results.append(('single-pass (html.parser)', best_of(scrape_ubik.parse_page, pages, repeat)))
+    finally:
+        scrape_ubik.lxml = lxml_module
+
+    baseline = results[0][1]
+    print(f"{len(pages)} pages, {size:.0f} KB, best of {repeat}")
+    for label, seconds in results:
+        print(f"  {label:28s} {seconds * 1000 / len(pages):8.2f} ms/page  {baseline / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,128 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# -------------------------
+# Shared benchmark helpers: repo paths, query corpus, percentiles and
+# result files (benchmarks/results/<kind>-<timestamp>.json)
+# -------------------------
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# What visitors actually type: short, often lower case, sometimes misspelled
+QUESTIONS = [
+    "What is UBIK?", "who is the founder of ubik", "Tell me about Ubik Solutions",
+    "what products does ubik make", "wat are your prodacts", "ethiglow products",
+    "Tell me about EthiGlo", "sisonext", "What is TrichoExito?", "hair care products",
+    "anti-acne products under ₹500", "which products contain azelaic acid",
+    "cheapest anti ageing product", "price of aczee serum", "benzonext price",
+    "how many anti-acne products", "products with salicylic acid under rs 300",
+    "where is ubik located", "contact details", "how many countries does ubik export to",
+    "ubik full form", "what are the leadership principles", "sales principles",
+    "how to handle price objections", "what events has ubik attended", "testimonials",
+    "new launches", "Ethicare Remedies", "Ethinext Pharma", "what is the company culture",
+    "tell me more", "When was Ubik founded?", "Innovation in whatever we do",
+    "dermatology", "cosmetology", "Is benzonext safe in pregnancy?",
+]
+TEMPLATES = ["{}", "what is {}", "tell me about {}", "{} details", "do you have {}"]
+
+
+def typo(word, rng):
+    if len(word) < 5:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def query_corpus(size=500, seed=7):
+    # Deterministic mix of fixed questions and templated entity questions
+    # (names from the knowledge files), ~15% with a transposition typo
+    from knowledge_store import load_knowledge
+    data = load_knowledge([os.path.join(REPO_ROOT, 'ubik_data.json'),
+                           os.path.join(REPO_ROOT, 'ubik_product_details.json')])
+    entities = [d['name'] for d in data.get('divisions', []) + data.get('subsidiaries', []) if 'name' in d]
+    entities += [p['name'] for p in data.get('products', {}).get('trichoexito_range', []) if 'name' in p]
+    entities += [p['name'] for c in data.get('product_categories', []) for p in c.get('products', [])]
+    entities += data.get('products', {}).get('categories', [])
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < size:
+        if rng.random() < 0.5:
+            query = rng.choice(QUESTIONS)
+        else:
+            query = rng.choice(TEMPLATES).format(rng.choice(entities))
+        if rng.random() < 0.15:
+            query = ' '.join(typo(w, rng) for w in query.split())
+        corpus.append(query)
+    return corpus
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+def summarize(samples, scale=1.0):
+    # samples: seconds; scale converts (1e3 -> ms, 1e6 -> µs)
+    values = sorted(s * scale for s in samples)
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1] if values else 0.0,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_results(kind, config, results, path=None):
+    document = {
+        'kind': kind,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'config': config,
+        'results': results,
+    }
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare(previous_path, results, metric, lower_is_better=True):
+    # Prints old -> new for each result present in both runs
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)['results']
+    print(f"\nCompared with {previous_path} ({metric}):")
+    for name, stats in results.items():
+        if name not in previous or metric not in previous[name]:
+            continue
+        old, new = previous[name][metric], stats[metric]
+        change = (new - old) / old * 100 if old else 0.0
+        better = change < 0 if lower_is_better else change > 0
+        marker = 'better' if better and abs(change) >= 5 else 'worse' if abs(change) >= 5 else 'same'
+        print(f"  {name:28s} {old:12.2f} -> {new:12.2f}  {change:+7.1f}%  {marker}")
@@ -0,0 +1,153 @@
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -------------------------
+# Local stand-in for the Gemini REST API
+#
+# Answers generateContent / streamGenerateContent with canned text after a
+# configurable delay, so the app can be load tested offline and with a
+# predictable model latency. Point the app at it with
+#   GEMINI_API_ENDPOINT=http://127.0.0.1:8089
+#
+#   python benchmarks/fake_gemini.py --port 8089 --latency 0.8 --jitter 0.2
+# -------------------------
+
+PATH_RE = re.compile(r'^/v1beta/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent|countTokens)')
+REPLY = ("Ubik Solutions is a dermatology and cosmetology company based in Rajkot, India, "
+         "with products sold in over 18 countries. Its portfolio covers anti-acne, anti-ageing, "
+         "hair care and skin lightening ranges, many of them first to market in India.")
+QUIZ_REPLY = json.dumps([
+    {"question": f"What is benchmark question number {n} about Ubik Solutions?",
+     "answer": "Ubik Solutions is a dermatology company based in Rajkot, India."}
+    for n in range(20)
+])
+
+
+def estimate_tokens(text):
+    return len(text.encode('utf-8')) // 4 + 1
+
+
+class FakeGemini:
+    def __init__(self, latency=0.5, jitter=0.0, chunks=4, error_rate=0.0, seed=0):
+        import random
+        self.latency = latency
+        self.jitter = jitter
+        self.chunks = chunks
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def delay(self):
+        with self.lock:
+            self.calls += 1
+            jitter = self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            failed = self.random.random() < self.error_rate
+        return max(0.0, self.latency + jitter), failed
+
+    def reply_for(self, prompt):
+        return QUIZ_REPLY if 'quiz question' in prompt else REPLY
+
+
+def response_body(text, prompt_tokens, final=True):
+    body = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}]}
+    if final:
+        body["candidates"][0]["finishReason"] = "STOP"
+        body["usageMetadata"] = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": estimate_tokens(text),
+            "totalTokenCount": prompt_tokens + estimate_tokens(text),
+        }
+    return body
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            match = PATH_RE.match(self.path)
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not match:
+                return self._json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            contents = request.get('contents', []) + [request.get('systemInstruction') or {}]
+            prompt = ''.join(part.get('text', '') for content in contents for part in content.get('parts', []))
+            if match.group('method') == 'countTokens':
+                # Used by the app's warmup; instant and not counted as a call
+                return self._json(200, {"totalTokens": estimate_tokens(prompt)})
+            latency, failed = fake.delay()
+            if failed:
+                time.sleep(latency)
+                return self._json(503, {"error": {"code": 503, "message": "Overloaded", "status": "UNAVAILABLE"}})
+            text = fake.reply_for(prompt)
+            prompt_tokens = estimate_tokens(prompt)
+
+            if match.group('method') == 'generateContent':
+                time.sleep(latency)
+                return self._json(200, response_body(text, prompt_tokens))
+
+            # Streamed: a JSON array written element by element, the latency
+            # split between time to first chunk and the rest
+            words = text.split(' ')
+            size = max(1, len(words) // fake.chunks)
+            pieces = [' '.join(words[i:i + size]) + ' ' for i in range(0, len(words), size)]
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            time.sleep(latency / 2)
+            for n, piece in enumerate(pieces):
+                last = n == len(pieces) - 1
+                element = ('[' if n == 0 else ',\r\n') + json.dumps(response_body(piece, prompt_tokens, last))
+                if last:
+                    element += ']'
+                data = element.encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                if not last:
+                    time.sleep(latency / 2 / len(pieces))
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def serve(port=8089, latency=0.5, jitter=0.0, chunks=4, error_rate=0.0):
+    # Starts in a daemon thread; returns (server, fake)
+    fake = FakeGemini(latency, jitter, chunks, error_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-gemini', daemon=True).start()
+    return server, fake
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Gemini REST server for load tests")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds per model call")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Uniform +/- seconds added to latency")
+    parser.add_argument('--chunks', type=int, default=4, help="Pieces per streamed reply")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of calls answered with 503")
+    args = parser.parse_args()
+    server, _ = serve(args.port, args.latency, args.jitter, args.chunks, args.error_rate)
+    print(f"Fake Gemini on http://127.0.0.1:{args.port} (latency {args.latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,229 @@
+import argparse
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from common import REPO_ROOT, compare, query_corpus, save_results, summarize
+from fake_gemini import serve as serve_fake_gemini
+
+# -------------------------
+# End-to-end load generator
+#
+# Starts the fake Gemini server, runs the real app in a subprocess pointed
+# at it (werkzeug threaded server, or gunicorn with gunicorn.conf.py), then
+# drives /api/chat, /api/questions and /api/evaluate from closed-loop
+# client threads. Reports throughput and p50/p95/p99 per endpoint plus the
+# app's answer-path counters from /metrics.
+#
+#   python benchmarks/load_test.py --duration 30 --concurrency 16 --latency 0.8
+#   python benchmarks/load_test.py --server gunicorn --workers 2 --compare results/load-....json
+# -------------------------
+
+DEFAULT_MIX = "chat=6,questions=2,evaluate=2"
+ANSWERS = [
+    "Ubik focuses on dermatology and cosmetology products.",
+    "Through research, quality checks and training programs for doctors.",
+    "I am not sure.",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def start_app(server, port, workers, env, log):
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', 'app:app', '--config', 'gunicorn.conf.py',
+                   '--bind', f'127.0.0.1:{port}', '--workers', str(workers)]
+    else:
+        command = [sys.executable, '-c',
+                   'from werkzeug.serving import run_simple; import app; '
+                   f'run_simple("127.0.0.1", {port}, app.app, threaded=True)']
+    # Output goes to a file: an unread pipe fills up and stalls the server
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(base, process, log_path, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                raise RuntimeError(f"App exited during startup:\n{f.read()[-2000:]}")
+        try:
+            if requests.get(f"{base}/metrics", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("App did not become ready")
+
+
+class Client(threading.Thread):
+    def __init__(self, base, mix, corpus, seed, stop_at, warmup_until, questions):
+        super().__init__(daemon=True)
+        self.base = base
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.corpus = corpus
+        self.rng = random.Random(seed)
+        self.stop_at = stop_at
+        self.warmup_until = warmup_until
+        self.questions = questions
+        self.session = requests.Session()
+        self.samples = {name: [] for name in self.names}
+        self.errors = {name: 0 for name in self.names}
+
+    def request(self, name):
+        if name == 'chat':
+            return self.session.post(f"{self.base}/api/chat", json={'message': self.rng.choice(self.corpus)}, timeout=60)
+        if name == 'chat_stream':
+            response = self.session.post(f"{self.base}/api/chat/stream",
+                                         json={'message': self.rng.choice(self.corpus)}, timeout=60, stream=True)
+            for _ in response.iter_content(chunk_size=None):
+                pass
+            return response
+        if name == 'questions':
+            response = self.session.get(f"{self.base}/api/questions", timeout=60)
+            if response.ok:
+                self.questions.extend(q for q in response.json() if isinstance(q, str))
+            return response
+        if name == 'evaluate':
+            question = self.rng.choice(self.questions) if self.questions else self.rng.choice(self.corpus)
+            return self.session.post(f"{self.base}/api/evaluate",
+                                     json={'question': question, 'answer': self.rng.choice(ANSWERS)}, timeout=60)
+        raise ValueError(f"Unknown endpoint {name}")
+
+    def run(self):
+        while time.time() < self.stop_at:
+            name = self.rng.choices(self.names, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = self.request(name).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if time.time() < self.warmup_until:
+                continue
+            if ok:
+                self.samples[name].append(elapsed)
+            else:
+                self.errors[name] += 1
+
+
+def answer_paths(metrics_text):
+    return {m.group(1): float(m.group(2))
+            for m in re.finditer(r'^ubik_answers_total\{path="([^"]+)"\} (\S+)$', metrics_text, re.M)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app against a fake Gemini")
+    parser.add_argument('--duration', type=float, default=20, help="Measured seconds (after warmup)")
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Endpoint weights: chat, chat_stream, questions, evaluate")
+    parser.add_argument('--latency', type=float, default=0.5, help="Fake Gemini seconds per call")
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--server', choices=['werkzeug', 'gunicorn'], default='werkzeug')
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--compare', default=None, help="Earlier result file to compare p95 against")
+    parser.add_argument('--out', default=None)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    fake_port, app_port = free_port(), free_port()
+    fake_server, fake = serve_fake_gemini(fake_port, args.latency, args.jitter, error_rate=args.error_rate)
+    scratch = tempfile.mkdtemp(prefix='ubik-load-')
+    env = {
+        **os.environ,
+        'GOOGLE_API_KEY': 'benchmark',
+        'GEMINI_API_ENDPOINT': f'http://127.0.0.1:{fake_port}',
+        # Fresh caches and pools every run, so runs are comparable
+        'ANSWER_CACHE_PATH': os.path.join(scratch, 'answers.sqlite3'),
+        'QUIZ_POOL_PATH': os.path.join(scratch, 'question_pool.json'),
+        'METRICS_DIR': os.path.join(scratch, 'metrics'),
+        'STATIC_BUILD_DIR': os.path.join(scratch, 'static_build'),
+        'TTS_SYNTHESIZER': 'stub',
+        'KNOWLEDGE_RELOAD_INTERVAL': '0',
+        'PORT': str(app_port),
+    }
+    base = f"http://127.0.0.1:{app_port}"
+    log_path = os.path.join(scratch, 'app.log')
+    log = open(log_path, 'w')
+    process = start_app(args.server, app_port, args.workers, env, log)
+    try:
+        wait_ready(base, process, log_path)
+        corpus = query_corpus(args.queries)
+        questions = []
+        warmup_until = time.time() + args.warmup
+        stop_at = warmup_until + args.duration
+        clients = [Client(base, mix, corpus, args.seed + i, stop_at, warmup_until, questions)
+                   for i in range(args.concurrency)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        paths = answer_paths(requests.get(f"{base}/metrics", timeout=10).text)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+        fake_server.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    results = {}
+    print(f"{args.server}, {args.concurrency} clients, {args.duration:.0f}s, fake Gemini {args.latency}s ±{args.jitter}s")
+    print(f"  {'endpoint':12s} {'requests':>9s} {'rps':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'errors':>7s}")
+    for name in list(mix) + ['all']:
+        if name == 'all':
+            samples = [s for c in clients for n in mix for s in c.samples[n]]
+            errors = sum(c.errors[n] for c in clients for n in mix)
+        else:
+            samples = [s for c in clients for s in c.samples[name]]
+            errors = sum(c.errors[name] for c in clients)
+        stats = summarize(samples, scale=1e3)
+        stats['rps'] = stats['count'] / args.duration
+        stats['errors'] = errors
+        results[name] = stats
+        print(f"  {name:12s} {stats['count']:9d} {stats['rps']:8.1f} {stats['p50']:9.1f} "
+              f"{stats['p95']:9.1f} {stats['p99']:9.1f} {errors:7d}")
+    total_answers = sum(paths.values())
+    if total_answers:
+        print("  answer paths: " + ", ".join(f"{k} {v / total_answers:.0%}" for k, v in sorted(paths.items())))
+    print(f"  fake Gemini calls: {fake.calls}")
+
+    config = {k: v for k, v in vars(args).items() if k not in ('compare', 'out')}
+    results['answer_paths'] = paths
+    results['model_calls'] = fake.calls
+    path = save_results('load', config, results, args.out)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(args.compare, {k: v for k, v in results.items() if isinstance(v, dict) and 'p95' in v}, 'p95')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from common import REPO_ROOT, compare, save_results, summarize
+from load_test import free_port, wait_ready
+
+# -------------------------
+# Startup cost: how long `import app` takes (and which packages dominate
+# it), and how much memory a gunicorn deployment uses with and without
+# --preload. Memory is read from /proc/<pid>/smaps_rollup (Linux only)
+# after a few requests per worker:
+#   rss: resident pages, shared ones counted in every process
+#   pss: shared pages split between the processes sharing them, so the
+#        sum over master and workers is the deployment's real footprint
+#   uss: pages private to one worker (what each extra worker costs)
+#
+#   python benchmarks/startup.py [--workers 4] [--runs 5] [--compare results/startup-....json]
+# -------------------------
+
+IMPORT_SNIPPET = "import time; s = time.perf_counter(); import app; print(time.perf_counter() - s)"
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)')
+WARMUP_QUESTIONS = ["price of aczee serum", "What is UBIK?", "hair care products"]
+
+
+def base_env(scratch):
+    # No network: model calls point at a closed port and are never made here
+    return {
+        **os.environ,
+        'GOOGLE_API_KEY': 'benchmark',
+        'GEMINI_API_ENDPOINT': f'http://127.0.0.1:{free_port()}',
+        'MODEL_WARMUP': '0',
+        'ANSWER_CACHE_PATH': os.path.join(scratch, 'answers.sqlite3'),
+        'QUIZ_POOL_PATH': os.path.join(scratch, 'question_pool.json'),
+        'METRICS_DIR': os.path.join(scratch, 'metrics'),
+        'STATIC_BUILD_DIR': os.path.join(scratch, 'static_build'),
+        'TTS_SYNTHESIZER': 'stub',
+        'KNOWLEDGE_RELOAD_INTERVAL': '0',
+    }
+
+
+def import_app(env):
+    # -> (seconds, {top-level package: cumulative seconds})
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', IMPORT_SNIPPET], cwd=REPO_ROOT,
+                            env=env, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(f"import app failed:\n{result.stderr[-2000:]}")
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            # The outermost import of a package has the largest cumulative time
+            name = match.group(3).split('.')[0]
+            packages[name] = max(packages.get(name, 0.0), int(match.group(2)) / 1e6)
+    return float(result.stdout.strip().splitlines()[-1]), packages
+
+
+def memory_kb(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if value.strip().endswith('kB'):
+                fields[name] = int(value.split()[0])
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def children(pid):
+    pids = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children', 'r') as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+
+def measure_gunicorn(env, workers, preload, requests_per_worker=10):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    command = [sys.executable, '-m', 'gunicorn', 'app:app', '--config', 'gunicorn.conf.py',
+               '--bind', f'127.0.0.1:{port}', '--workers', str(workers)] + (['--preload'] if preload else [])
+    env = {**env, 'PORT': str(port), 'GUNICORN_PRELOAD': '1' if preload else '0'}
+    log_path = os.path.join(os.path.dirname(env['METRICS_DIR']), f'gunicorn-{port}.log')
+    log = open(log_path, 'w')
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_ready(base, process, log_path)
+        # All workers up (and serving) before memory is read
+        deadline = time.time() + 60
+        while len(children(process.pid)) < workers and time.time() < deadline:
+            time.sleep(0.1)
+        ready = time.perf_counter() - started
+        session = requests.Session()
+        for i in range(requests_per_worker * workers):
+            session.post(f"{base}/api/chat", json={'message': WARMUP_QUESTIONS[i % len(WARMUP_QUESTIONS)]}, timeout=10)
+        session.get(f"{base}/metrics", timeout=10)
+        master = memory_kb(process.pid)
+        worker_memory = [memory_kb(pid) for pid in children(process.pid)]
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+    mb = 1024.0
+    return {
+        'ready_s': ready,
+        'worker_rss_mb': sum(w['rss'] for w in worker_memory) / len(worker_memory) / mb,
+        'worker_uss_mb': sum(w['uss'] for w in worker_memory) / len(worker_memory) / mb,
+        'total_pss_mb': (master['pss'] + sum(w['pss'] for w in worker_memory)) / mb,
+        'master_rss_mb': master['rss'] / mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and per-worker memory")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=5, help="Fresh-interpreter imports to time")
+    parser.add_argument('--compare', default=None, help="Earlier result file to compare against")
+    parser.add_argument('--out', default=None)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='ubik-startup-')
+    env = base_env(scratch)
+    try:
+        import_app(env)  # Builds the static assets and warms the OS file cache
+        timings, packages = [], {}
+        for _ in range(args.runs):
+            seconds, packages = import_app(env)
+            timings.append(seconds)
+        deployments = {
+            f'gunicorn x{args.workers}': measure_gunicorn(env, args.workers, preload=False),
+            f'gunicorn x{args.workers} --preload': measure_gunicorn(env, args.workers, preload=True),
+        }
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    imports = summarize(timings, scale=1e3)
+    print(f"import app: mean {imports['mean']:.0f} ms, p50 {imports['p50']:.0f} ms ({args.runs} runs)")
+    print("  slowest top-level imports (ms):")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[1:9]:  # [0] is app itself
+        print(f"    {name:28s} {seconds * 1e3:8.1f}")
+    print(f"\n  {'deployment':28s} {'ready s':>8s} {'rss/worker':>11s} {'uss/worker':>11s} {'total pss':>10s}")
+    for name, stats in deployments.items():
+        print(f"  {name:28s} {stats['ready_s']:8.2f} {stats['worker_rss_mb']:9.1f}MB "
+              f"{stats['worker_uss_mb']:9.1f}MB {stats['total_pss_mb']:8.1f}MB")
+
+    results = {'import app (ms)': imports, **deployments}
+    config = {'workers': args.workers, 'runs': args.runs, 'import_ms_by_package': {
+        name: round(seconds * 1e3, 1) for name, seconds in packages.items()}}
+    path = save_results('startup', config, results, args.out)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(args.compare, results, 'p50')
+        compare(args.compare, results, 'total_pss_mb')
+        compare(args.compare, results, 'worker_uss_mb')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+# -------------------------
+# Structured product catalog
+#
+# Built once from the `product_categories` section of the knowledge data:
+# a price column kept in price order (range filters are two bisects), an
+# ingredient inverted index and a category map. A small rule-based parser
+# turns questions like "anti-acne products under ₹500" or "which products
+# contain azelaic acid" into a filter/sort/lookup over those structures.
+# Anything it cannot parse returns None so the caller can fall back.
+# -------------------------
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+PRICE_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+# "Lactic Acid: Mild exfoliant ....Glycolic Acid: Exfoliates ..." -> names before colons
+NAMED_INGREDIENT_RE = re.compile(r'(?:^|[.;]\s*)([^.:;]+?):')
+
+CURRENCY = r'(?:₹|rs\.?|inr|rupees?)?\s*'
+AMOUNT = CURRENCY + r'(\d[\d,]*(?:\.\d+)?)\s*(?:₹|rs\.?|inr|rupees?|/-)?'
+MAX_PRICE_RE = re.compile(r'\b(?:under|below|less than|cheaper than|up ?to|within|at most|max(?:imum)?|<=?)\s*' + AMOUNT)
+MIN_PRICE_RE = re.compile(r'\b(?:over|above|more than|greater than|costlier than|at least|min(?:imum)?|>=?)\s*' + AMOUNT)
+BETWEEN_RE = re.compile(r'\bbetween\s*' + AMOUNT + r'\s*(?:and|to|-)\s*' + AMOUNT)
+CHEAPEST_RE = re.compile(r'\b(?:cheapest|least expensive|lowest price[d]?|most affordable|budget)\b')
+PRICIEST_RE = re.compile(r'\b(?:most expensive|costliest|priciest|highest price[d]?|premium)\b')
+COUNT_RE = re.compile(r'\bhow many\b')
+LIST_RE = re.compile(r'\b(?:products?|items?|which|list|show|any|options?|range)\b')
+PLURAL_RE = re.compile(r'\b(?:products|items|options|ones|all)\b')
+# Words introducing an ingredient ("contain azelaic acid", "made of ...")
+INGREDIENT_TRIGGERS = frozenset(
+    "contain contains containing with having has ingredient ingredients composition".split()
+)
+# Words that end an ingredient phrase ("salicylic acid | under rs 300")
+PHRASE_BOUNDARIES = frozenset(
+    "product products item items any all some only under below over above between less more than "
+    "within upto up rs inr rupees price priced cost costing cheap cheapest expensive made please "
+    "that those list show".split()
+) | INGREDIENT_TRIGGERS
+
+# Attribute questions about a named product
+PRICE_FIELD_RE = re.compile(r'\b(?:price|cost|how much|mrp|rate)\b')
+INGREDIENT_FIELD_RE = re.compile(r'\b(?:ingredients?|composition|contain(?:s)?|made (?:with|of)|formula)\b')
+LINK_FIELD_RE = re.compile(r'\b(?:link|url|buy|purchase|order|where)\b')
+DESCRIBE_FIELD_RE = re.compile(r'\b(?:what is|what\'?s|tell me about|describe|details?|about|info(?:rmation)?)\b')
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it me of on or "
+    "tell the their this to what when where which who why with you your".split()
+)
+# Name words that say nothing about which product is meant
+GENERIC_NAME_WORDS = frozenset(
+    "gel serum cream face wash solution skin peeling lotion spray oil foam soap "
+    "gm g ml mg kg l anti".split()
+)
+MAX_LISTED = 5
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(text.lower()))
+
+
+def parse_price(text):
+    match = PRICE_RE.search(text or '')
+    return float(match.group().replace(',', '')) if match else None
+
+
+def format_price(price):
+    return f"₹{price:,.0f}" if price == int(price) else f"₹{price:,.2f}"
+
+
+def ingredient_names(text):
+    # Individual ingredient names from the free-form ingredient field
+    named = NAMED_INGREDIENT_RE.findall(text)
+    parts = named if named else re.split(r'[,;+\n]|\band\b', text)
+    return [name for name in (normalize(part) for part in parts) if name]
+
+
+def _is_boundary(word):
+    return word in STOPWORDS or word in PHRASE_BOUNDARIES or word.isdigit()
+
+
+def _ngrams(words, n_max):
+    for n in range(min(n_max, len(words)), 0, -1):
+        for i in range(len(words) - n + 1):
+            yield ' '.join(words[i:i + n])
+
+
+class ProductCatalog:
+    def __init__(self, categories):
+        # Row-per-product columns
+        self.names = []
+        self.categories = []
+        self.descriptions = []
+        self.ingredients = []
+        self.urls = []
+        self.prices = array('d')  # NaN when the price does not parse
+        self.ingredient_text = []  # Normalized, space padded for phrase checks
+
+        self.category_rows = {}
+        self.category_aliases = {}
+        self.ingredient_postings = {}
+        self.ingredient_phrases = set()
+        name_postings = {}
+
+        for category in categories or []:
+            for product in category.get('products', []):
+                row = len(self.names)
+                category_name = product.get('category') or category.get('name', '')
+                self.names.append(product.get('name', ''))
+                self.categories.append(category_name)
+                self.descriptions.append(product.get('description', ''))
+                self.ingredients.append(product.get('ingredients', ''))
+                self.urls.append(product.get('url', ''))
+                price = parse_price(product.get('price'))
+                self.prices.append(price if price is not None else float('nan'))
+                self.ingredient_text.append(f" {normalize(self.ingredients[row])} ")
+
+                self.category_rows.setdefault(category_name, set()).add(row)
+                for word in set(WORD_RE.findall(self.ingredients[row].lower())):
+                    self.ingredient_postings.setdefault(word, set()).add(row)
+                for name in ingredient_names(self.ingredients[row]):
+                    words = name.split()
+                    self.ingredient_phrases.update(
+                        gram for gram in _ngrams(words, 4) if gram not in STOPWORDS and not gram.isdigit())
+                for word in set(WORD_RE.findall(self.names[row].lower())):
+                    name_postings.setdefault(word, set()).add(row)
+
+        # "Anti-Acne" -> "anti acne", "acne"; "Anti Ageing" -> also "anti aging", "ageing", "aging"
+        for category_name in self.category_rows:
+            alias = normalize(category_name)
+            variants = {alias, alias.replace('ageing', 'aging')}
+            variants |= {v[len('anti '):] for v in variants if v.startswith('anti ')}
+            for variant in variants:
+                self.category_aliases[variant] = category_name
+        self.category_words = {word for alias in self.category_aliases for word in alias.split()}
+
+        # Price order: rows with a price, sorted; prices alongside for bisect
+        self.by_price = sorted((row for row in range(len(self.names)) if self.prices[row] == self.prices[row]),
+                               key=lambda row: (self.prices[row], row))
+        self.sorted_prices = array('d', (self.prices[row] for row in self.by_price))
+
+        # Distinctive name words (brands etc.) identify a product in a question
+        self.name_postings = {
+            word: rows for word, rows in name_postings.items()
+            if len(word) >= 2 and not word.isdigit() and word not in GENERIC_NAME_WORDS
+            and word not in STOPWORDS and word not in self.ingredient_postings
+            and word not in self.category_aliases
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def with_ingredient(self, phrase):
+        words = phrase.split()
+        rows = None
+        for word in words:
+            posting = self.ingredient_postings.get(word)
+            if not posting:
+                return set()
+            rows = set(posting) if rows is None else rows & posting
+        return {row for row in rows if f" {phrase} " in self.ingredient_text[row]}
+
+    def price_range(self, low=None, high=None):
+        # Rows with low <= price <= high, already in ascending price order
+        start = 0 if low is None else bisect_left(self.sorted_prices, low)
+        end = len(self.by_price) if high is None else bisect_right(self.sorted_prices, high)
+        return self.by_price[start:end]
+
+    def find_products(self, words):
+        # Rows named by the question; best overlap wins, ties are all returned
+        scores = {}
+        for word in words:
+            for row in self.name_postings.get(word, ()):
+                scores[row] = scores.get(row, 0) + 1
+        if not scores:
+            return []
+        # Generic words (gel, serum, 20 gm ...) only break ties between brand matches
+        word_set = set(words)
+        ranked = {row: (score, len(word_set & set(WORD_RE.findall(self.names[row].lower()))))
+                  for row, score in scores.items()}
+        best = max(ranked.values())
+        return sorted((row for row, rank in ranked.items() if rank == best), key=lambda row: self.prices[row])
+
+    # -------------------------
+    # Query parsing
+    # -------------------------
+    def parse(self, text):
+        # Structured query dict, or None when the text is not a catalog question
+        if not self.names:
+            return None
+        lowered = text.lower()
+        words = WORD_RE.findall(lowered)
+        normalized = ' ' + ' '.join(words) + ' '
+        query = {'category': None, 'ingredient': None, 'min_price': None, 'max_price': None,
+                 'sort': None, 'limit': MAX_LISTED, 'count': False, 'products': None, 'field': None}
+
+        for alias in sorted(self.category_aliases, key=len, reverse=True):
+            if f" {alias} " in normalized:
+                query['category'] = self.category_aliases[alias]
+                break
+
+        between = BETWEEN_RE.search(lowered)
+        if between:
+            low, high = sorted(float(g.replace(',', '')) for g in between.groups())
+            query['min_price'], query['max_price'] = low, high
+        else:
+            high = MAX_PRICE_RE.search(lowered)
+            low = MIN_PRICE_RE.search(lowered)
+            if high:
+                query['max_price'] = float(high.group(1).replace(',', ''))
+            if low:
+                query['min_price'] = float(low.group(1).replace(',', ''))
+
+        if CHEAPEST_RE.search(lowered):
+            query['sort'] = 'asc'
+        elif PRICIEST_RE.search(lowered):
+            query['sort'] = 'desc'
+        query['count'] = bool(COUNT_RE.search(lowered))
+
+        products = self.find_products(words)
+        if not products:
+            phrase = self._asked_ingredient(words)
+            if phrase is not None:
+                # The whole phrase must be a known ingredient: answering
+                # "kojic acid" with every "acid" product would be wrong
+                if phrase not in self.ingredient_phrases or phrase in self.category_aliases:
+                    return None
+                query['ingredient'] = phrase
+            elif 'product' in lowered:
+                query['ingredient'] = self._ingredient_mention(words)
+
+        if products:
+            # Attribute lookup for a named product
+            if PRICE_FIELD_RE.search(lowered):
+                query['field'] = 'price'
+            elif INGREDIENT_FIELD_RE.search(lowered):
+                query['field'] = 'ingredients'
+            elif LINK_FIELD_RE.search(lowered):
+                query['field'] = 'url'
+            elif DESCRIBE_FIELD_RE.search(lowered):
+                query['field'] = 'description'
+            else:
+                return None
+            query['products'] = products
+            return query
+
+        filtered = (query['category'] or query['ingredient'] or query['min_price'] is not None
+                    or query['max_price'] is not None or query['sort'])
+        if not filtered or not (LIST_RE.search(lowered) or query['sort'] or query['count']):
+            return None
+        if query['sort'] and not PLURAL_RE.search(lowered):
+            query['limit'] = 1  # "cheapest anti-acne product"
+        return query
+
+    def _asked_ingredient(self, words):
+        # Phrase after "contain"/"with"/"made of"..., or None without one
+        for i, word in enumerate(words):
+            if word not in INGREDIENT_TRIGGERS and not (word == 'of' and i and words[i - 1] == 'made'):
+                continue
+            rest = words[i + 1:]
+            while rest and rest[0] in ('a', 'an', 'the', 'any', 'some'):
+                rest = rest[1:]
+            phrase = []
+            for following in rest:
+                if _is_boundary(following) or following in self.category_words:
+                    break
+                phrase.append(following)
+            if phrase:
+                return ' '.join(phrase)
+        return None
+
+    def _ingredient_mention(self, words):
+        # "azelaic acid products": a known ingredient standing on its own,
+        # not part of a longer phrase ("acid" in "kojic acid")
+        for n in range(min(4, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                gram = ' '.join(words[i:i + n])
+                if gram not in self.ingredient_phrases or gram in self.category_aliases:
+                    continue
+                before = words[i - 1] if i else None
+                after = words[i + n] if i + n < len(words) else None
+                if all(w is None or _is_boundary(w) or w in self.category_words for w in (before, after)):
+                    return gram
+        return None
+
+    def execute(self, query):
+        # Rows matching a parsed filter query, in the requested order
+        rows = self.price_range(query['min_price'], query['max_price'])
+        if query['min_price'] is None and query['max_price'] is None:
+            # Unpriced products still belong in unfiltered listings
+            rows = rows + [row for row in range(len(self.names)) if self.prices[row] != self.prices[row]]
+        if query['category']:
+            members = self.category_rows[query['category']]
+            rows = [row for row in rows if row in members]
+        if query['ingredient']:
+            members = self.with_ingredient(query['ingredient'])
+            rows = [row for row in rows if row in members]
+        if query['sort'] == 'desc':
+            rows = rows[::-1]
+        return rows
+
+    # -------------------------
+    # Answers
+    # -------------------------
+    def _describe_filter(self, query):
+        label = f"{query['category']} products" if query['category'] else "Products"
+        if query['ingredient']:
+            label += f" containing {query['ingredient']}"
+        if query['min_price'] is not None and query['max_price'] is not None:
+            label += f" between {format_price(query['min_price'])} and {format_price(query['max_price'])}"
+        elif query['max_price'] is not None:
+            label += f" under {format_price(query['max_price'])}"
+        elif query['min_price'] is not None:
+            label += f" over {format_price(query['min_price'])}"
+        return label
+
+    def _line(self, row, show_category):
+        price = format_price(self.prices[row]) if self.prices[row] == self.prices[row] else "price on request"
+        suffix = f" ({self.categories[row]})" if show_category else ""
+        return f"- {self.names[row]}: {price}{suffix}"
+
+    def _product_answer(self, query):
+        lines = []
+        for row in query['products'][:MAX_LISTED]:
+            name = self.names[row]
+            if query['field'] == 'price':
+                price = self.prices[row]
+                lines.append(f"{name} costs {format_price(price)}." if price == price
+                             else f"{name}: price on request.")
+            elif query['field'] == 'ingredients':
+                lines.append(f"{name} contains {self.ingredients[row]}" if self.ingredients[row]
+                             else f"{name}: ingredients not listed.")
+            elif query['field'] == 'url':
+                lines.append(f"{name}: {self.urls[row]}" if self.urls[row] else f"{name}: no link available.")
+            else:
+                price = f" ({format_price(self.prices[row])})" if self.prices[row] == self.prices[row] else ""
+                lines.append(f"{name}{price}: {self.descriptions[row]}")
+        return "\n".join(lines)
+
+    def answer(self, text):
+        # Deterministic reply for a catalog question, or None to fall back
+        query = self.parse(text)
+        if query is None:
+            return None
+        if query['products']:
+            return self._product_answer(query)
+
+        rows = self.execute(query)
+        label = self._describe_filter(query)
+        if query['sort'] and query['limit'] > 1:
+            label += ", cheapest first" if query['sort'] == 'asc' else ", most expensive first"
+        if query['count']:
+            return f"{label}: {len(rows)}."
+        if not rows:
+            return f"No {label[0].lower() + label[1:]} found in the catalog."
+        listed = rows[:query['limit']]
+        if query['limit'] == 1:
+            which = 'cheapest' if query['sort'] == 'asc' else 'most expensive'
+            label = label.replace("Products", "product", 1).replace(" products", " product", 1)
+            return f"The {which} {label} is {self._line(listed[0], not query['category'])[2:]}."
+        lines = [f"{label} ({len(rows)}):"]
+        lines.extend(self._line(row, not query['category']) for row in listed)
+        if len(rows) > len(listed):
+            lines.append(f"...and {len(rows) - len(listed)} more.")
+        return "\n".join(lines)
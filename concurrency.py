@@ -0,0 +1,122 @@
+import threading
+import time
+
+# -------------------------
+# Concurrency controls for upstream model calls
+# -------------------------
+
+
+class ModelBusyError(RuntimeError):
+    pass
+
+
+class ConcurrencyLimiter:
+    # Bounded number of simultaneous model calls; callers queue up to `timeout`
+    def __init__(self, limit, timeout):
+        self.limit = limit
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.rejected = 0
+
+    def __enter__(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.rejected += 1
+            raise ModelBusyError(f"No model slot free within {self.timeout}s ({self.limit} in flight)")
+        with self._lock:
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+        return False
+
+
+class SingleFlight:
+    # Identical concurrent calls share one execution: the first caller
+    # starts fn, the others get the same Future (result or exception)
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def submit(self, key, executor, fn):
+        # Shared Future of fn running on executor, so callers can wait on
+        # it with their own timeout
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self._calls[key] = executor.submit(fn)
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    # closed -> open after `failure_threshold` consecutive failures; after
+    # `reset_timeout` one probe call is let through (half-open): success
+    # closes the breaker, failure re-opens it for another reset_timeout
+    CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.counters = {'opened': 0, 'short_circuited': 0, 'probes': 0}
+
+    def _transition(self, state, reason):
+        if state != self.state:
+            print(f"Circuit breaker {self.name}: {self.state} -> {state} ({reason})")
+            self.state = state
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._transition(self.HALF_OPEN, "probing")
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                self.counters['probes'] += 1
+                return True
+            self.counters['short_circuited'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition(self.CLOSED, "call succeeded")
+
+    def record_failure(self, reason="call failed"):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.counters['opened'] += 1
+                self._transition(self.OPEN, f"{reason}, {self.failures} consecutive failures")
+
+    def release(self):
+        # Neither success nor failure (e.g. rejected locally): frees a probe slot
+        with self._lock:
+            self._probing = False
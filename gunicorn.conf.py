@@ -0,0 +1,45 @@
+import gc
+import os
+import shutil
+
+# -------------------------
+# Gunicorn settings (see Procfile)
+#
+# gthread workers keep serving other requests while a thread waits on
+# Gemini, instead of pinning the whole worker like the default sync class.
+# Model calls themselves are capped by MODEL_MAX_CONCURRENCY in app.py.
+#
+# The app is preloaded: the master imports it and builds the knowledge
+# indexes once, and forked workers share those pages copy-on-write
+# instead of each parsing the JSON and building its own copy. Workers
+# then start their own background threads (post_worker_init).
+# -------------------------
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 16))
+# Streamed replies and slow model calls need more than the 30s default
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+keepalive = 5
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# Each worker snapshots its metrics here and /metrics merges them
+os.environ.setdefault("METRICS_DIR", "/tmp/ubik_metrics")
+# Threads started while importing the app would not survive the fork
+os.environ["DEFER_BACKGROUND_TASKS"] = "1"
+
+def on_starting(server):
+    # Counters restart from zero with the server, not with each worker
+    # (with preload_app this runs after the app created the directory)
+    shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["METRICS_DIR"], exist_ok=True)
+
+def pre_fork(server, worker):
+    # Everything the master built moves to the permanent GC generation, so
+    # collections in the workers do not write to (and un-share) those pages
+    gc.freeze()
+
+def post_worker_init(worker):
+    # Runs in each worker once the app is loaded, preloaded or not
+    import app
+    app.start_background_tasks()
@@ -0,0 +1,212 @@
+import re
+from array import array
+from functools import lru_cache
+
+# -------------------------
+# Precompiled knowledge index
+#
+# Flattens the knowledge JSON once so a query no longer re-walks and
+# re-stringifies the whole document. Results are identical to the
+# recursive search_json below (same matches, same order); tests/ checks this.
+# -------------------------
+
+# Paths under these keys are never searched (mirrors search_json)
+SKIP_PATHS = ['address', 'contact', 'name', 'isbn', 'publisher']
+SKIP_SCALAR_PATHS = ['address', 'contact']
+PRIORITY_KEYS = ['description', 'examples', 'kpis', 'title']
+
+TOKEN_RE = re.compile(r'\w+')
+# Queries containing repr() structure characters, or padded with whitespace,
+# can match across two values of str(dict); those use the exact slow path.
+UNSAFE_QUERY_RE = re.compile(r'[\'"\\:,\[\]{}]|^\s|\s$')
+
+
+class KnowledgeIndex:
+    def __init__(self, data):
+        self.data = data
+
+        # Result slots, in the exact order search_json would append them
+        self.paths = []
+        self.values = []
+        self.keys = []  # dict key for entry slots, None for scalar slots
+        self.priority = array('b')
+        self.depth = array('H')
+
+        # Leaf text segments (dict keys and scalar values)
+        self.seg_text = []  # str(x).lower()
+        self.seg_repr = []  # repr() form as it appears inside str(parent), if different
+        self.seg_is_key = array('b')
+        # Slots matched directly by a segment / through an enclosing container (CSR)
+        self.direct_offsets = array('I', [0])
+        self.direct_slots = array('I')
+        self.container_offsets = array('I', [0])
+        self.container_slots = array('I')
+
+        postings = {}
+        self._walk(data, "", True, [], None, postings)
+        self.postings = {token: array('I', ids) for token, ids in postings.items()}
+        self.vocabulary = tuple(self.postings)
+        self._slot_texts = None
+        self._expand = lru_cache(maxsize=4096)(self._expand_token)
+
+    # -------------------------
+    # Build
+    # -------------------------
+    def _add_slot(self, path, value, key, priority):
+        self.paths.append(path)
+        self.values.append(value)
+        self.keys.append(key)
+        self.priority.append(priority)
+        self.depth.append(path.count('.'))
+        return len(self.paths) - 1
+
+    def _add_segment(self, text, is_key, direct, containers, postings):
+        seg_id = len(self.seg_text)
+        raw = text.lower()
+        quoted = repr(text)[1:-1].lower() if isinstance(text, str) else raw
+        self.seg_text.append(raw)
+        self.seg_repr.append(quoted if quoted != raw else None)
+        self.seg_is_key.append(1 if is_key else 0)
+        self.direct_slots.extend(direct)
+        self.direct_offsets.append(len(self.direct_slots))
+        self.container_slots.extend(containers)
+        self.container_offsets.append(len(self.container_slots))
+        for token in set(TOKEN_RE.findall(raw)) | set(TOKEN_RE.findall(quoted)):
+            postings.setdefault(token, []).append(seg_id)
+
+    def _walk(self, obj, path, live, containers, entry, postings):
+        # live: search_json would visit this node; containers: live entry slots
+        # whose str(value) contains this node; entry: slot whose value is obj
+        if isinstance(obj, dict):
+            skipped = not live or any(skip in path.lower() for skip in SKIP_PATHS)
+            for k, v in obj.items():
+                slot = None
+                if not skipped:
+                    slot = self._add_slot(path + k, v, k, 2 if k in PRIORITY_KEYS else 1)
+                self._add_segment(str(k), True, [] if slot is None else [slot], containers, postings)
+                child_containers = containers
+                if slot is not None and isinstance(v, (dict, list)):
+                    child_containers = containers + [slot]
+                self._walk(v, path + k + ".", not skipped, child_containers, slot, postings)
+        elif isinstance(obj, list):
+            for idx, item in enumerate(obj):
+                self._walk(item, path + f"[{idx}].", live, containers, None, postings)
+        else:
+            direct = []
+            if entry is not None:
+                direct.append(entry)
+            if (live and isinstance(obj, (str, int, float))
+                    and not any(skip in path.lower() for skip in SKIP_SCALAR_PATHS)):
+                slot = self._add_slot(path[:-1], obj, None, 1)
+                direct.append(slot)
+            self._add_segment(obj if isinstance(obj, str) else str(obj), False, direct, containers, postings)
+
+    # -------------------------
+    # Query
+    # -------------------------
+    def _expand_token(self, token):
+        # Vocabulary tokens containing a (possibly partial) query token
+        return tuple(word for word in self.vocabulary if token in word)
+
+    def _candidates(self, q):
+        spans = [(m.group(), m.start(), m.end()) for m in TOKEN_RE.finditer(q)]
+        if not spans:
+            return range(len(self.seg_text))
+        # A token bounded by non-word characters inside the query must be a whole token
+        interior = [t for t, s, e in spans if s > 0 and e < len(q)]
+        if interior:
+            return self.postings.get(max(interior, key=len), ())
+        token = max((t for t, _, _ in spans), key=len)
+        seg_ids = set()
+        for word in self._expand(token):
+            seg_ids.update(self.postings[word])
+        return seg_ids
+
+    def _match(self, q):
+        # Returns {slot: value_hit}
+        hits = {}
+        if not q:
+            return dict.fromkeys(range(len(self.paths)), True)
+        if UNSAFE_QUERY_RE.search(q):
+            return self._match_exact(q)
+        for seg in self._candidates(q):
+            text = self.seg_text[seg]
+            if q in text:
+                value_hit = not self.seg_is_key[seg]
+                for i in range(self.direct_offsets[seg], self.direct_offsets[seg + 1]):
+                    slot = self.direct_slots[i]
+                    hits[slot] = hits.get(slot, False) or value_hit
+            quoted = self.seg_repr[seg]
+            if q in (text if quoted is None else quoted):
+                for i in range(self.container_offsets[seg], self.container_offsets[seg + 1]):
+                    hits[self.container_slots[i]] = True
+        return hits
+
+    def _match_exact(self, q):
+        # Same comparisons as search_json, against texts lowered once
+        if self._slot_texts is None:
+            self._slot_texts = [
+                (None if k is None else str(k).lower(), str(v).lower())
+                for k, v in zip(self.keys, self.values)
+            ]
+        hits = {}
+        for slot, (key, value) in enumerate(self._slot_texts):
+            if q in value:
+                hits[slot] = True
+            elif key is not None and q in key:
+                hits[slot] = False
+        return hits
+
+    def _result(self, slot):
+        return {"path": self.paths[slot], "value": self.values[slot], "priority": self.priority[slot]}
+
+    def search(self, query):
+        # Drop-in for search_json(data, query)
+        return [self._result(slot) for slot in sorted(self._match(query.lower()))]
+
+    def ranked(self, query, max_items=None):
+        # Matches ordered by the relevance score of generate_answer_from_json
+        hits = self._match(query.lower())
+
+        def relevance_score(slot):
+            score = self.priority[slot]
+            if hits[slot]:
+                score += 1.0  # Bonus for query in value
+            score += self.depth[slot] * 0.5
+            if not self.paths[slot]:
+                score -= 1.0
+            return score
+
+        slots = sorted(sorted(hits), key=relevance_score, reverse=True)
+        return [self._result(slot) for slot in slots[:max_items]]
+
+
+# -------------------------
+# JSON search helper (prioritize relevant fields)
+# Original recursive walk, kept as the reference for KnowledgeIndex
+# -------------------------
+def search_json(data, query):
+    results = []
+
+    def _search(obj, path=""):
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                # Skip irrelevant paths
+                if any(skip in path.lower() for skip in ['address', 'contact', 'name', 'isbn', 'publisher']):
+                    continue
+                # Prioritize matches in specific fields
+                if query.lower() in str(k).lower() or query.lower() in str(v).lower():
+                    if k in ['description', 'examples', 'kpis', 'title']:
+                        results.append({"path": path + k, "value": v, "priority": 2})
+                    else:
+                        results.append({"path": path + k, "value": v, "priority": 1})
+                _search(v, path + k + ".")
+        elif isinstance(obj, list):
+            for idx, item in enumerate(obj):
+                _search(item, path + f"[{idx}].")
+        elif isinstance(obj, (str, int, float)):
+            if query.lower() in str(obj).lower() and not any(skip in path.lower() for skip in ['address', 'contact']):
+                results.append({"path": path[:-1], "value": obj, "priority": 1})
+
+    _search(data)
+    return results
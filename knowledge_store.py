@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+
+from answer_cache import fingerprint_files
+
+# -------------------------
+# Hot-reloadable knowledge store
+#
+# The knowledge JSON files are merged into one dict and every derived index
+# (search index, retriever, spell corrector, ...) is built from it into an
+# immutable snapshot. A watcher thread polls the files' mtime/size; when
+# their content hash changes, a new snapshot is built in the background and
+# published with a single reference assignment. Requests read
+# store.current once (app.py pins it on flask.g) and keep using that
+# snapshot, so they never wait for a rebuild, see a half-built one or mix
+# two versions.
+# -------------------------
+
+
+class KnowledgeError(ValueError):
+    pass
+
+
+def load_knowledge(paths, required=1):
+    # Merges top-level keys of each file; the first `required` files must exist
+    merged = {}
+    for n, path in enumerate(paths):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            if n < required:
+                raise KnowledgeError(f"{path} not found. Ensure it exists in the project root.")
+            continue
+        except json.JSONDecodeError:
+            if n < required:
+                raise KnowledgeError(f"{path} is invalid. Check its JSON format.")
+            print(f"Knowledge file {path} is invalid JSON, skipped")
+            continue
+        if isinstance(data, dict):
+            merged.update(data)
+    return merged
+
+
+def file_signature(paths):
+    # Cheap change check (no reads): (mtime_ns, size) per file
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class KnowledgeSnapshot:
+    # One consistent version of the data and everything derived from it
+    def __init__(self, version, fingerprint, data, indexes):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.data = data
+        self.loaded_at = time.time()
+        self.__dict__.update(indexes)
+
+
+class KnowledgeStore:
+    def __init__(self, paths, build, interval=30.0, required=1):
+        # build(data) -> dict of derived indexes, attached to the snapshot
+        self.paths = list(paths)
+        self.build = build
+        self.interval = interval
+        self.required = required
+        self.listeners = []
+        self._reload_lock = threading.Lock()
+        self._thread = None
+        self.counters = {'reloads': 0, 'unchanged': 0, 'errors': 0}
+        self.last_error = None
+        self.signature = file_signature(self.paths)
+        self.current = self._build(1, fingerprint_files(self.paths))
+
+    def _build(self, version, fingerprint):
+        start = time.perf_counter()
+        data = load_knowledge(self.paths, self.required)
+        snapshot = KnowledgeSnapshot(version, fingerprint, data, self.build(data))
+        print(f"Knowledge v{version} ({fingerprint}) built in {time.perf_counter() - start:.2f}s")
+        return snapshot
+
+    def on_reload(self, listener):
+        # listener(snapshot) runs after each swap
+        self.listeners.append(listener)
+
+    def reload(self, force=False):
+        # Rebuilds if the files changed; returns True when a new snapshot was published
+        with self._reload_lock:
+            signature = file_signature(self.paths)
+            if signature == self.signature and not force:
+                return False
+            fingerprint = fingerprint_files(self.paths)
+            if fingerprint == self.current.fingerprint and not force:
+                # Touched but identical (e.g. a crawl that found nothing new)
+                self.signature = signature
+                self.counters['unchanged'] += 1
+                return False
+            try:
+                snapshot = self._build(self.current.version + 1, fingerprint)
+            except Exception as e:
+                # Keep serving the old snapshot; a half-written file is retried next poll
+                self.counters['errors'] += 1
+                self.last_error = str(e)
+                print(f"Knowledge reload failed: {str(e)}")
+                return False
+            self.signature = signature
+            self.current = snapshot
+            self.counters['reloads'] += 1
+            self.last_error = None
+        for listener in self.listeners:
+            listener(snapshot)
+        return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Knowledge watcher error: {str(e)}")
+
+    def start(self):
+        # Idempotent; polling is disabled with interval <= 0
+        if self._thread is not None or self.interval <= 0:
+            return
+        with self._reload_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, name='knowledge-watcher', daemon=True)
+                self._thread.start()
+
+    def stats(self):
+        snapshot = self.current
+        return {
+            **self.counters,
+            'version': snapshot.version,
+            'fingerprint': snapshot.fingerprint,
+            'loaded_at': snapshot.loaded_at,
+            'files': self.paths,
+            'last_error': self.last_error,
+            'pid': os.getpid(),
+        }
@@ -0,0 +1,288 @@
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# -------------------------
+# Lightweight metrics (Prometheus text format)
+#
+# Counters and histograms are plain dicts of lists guarded by one lock, so
+# an observation costs about a microsecond and can stay on in production.
+# With gunicorn every worker has its own registry; when METRICS_DIR is set
+# each worker dumps a snapshot there and /metrics sums all of them.
+#
+# Per-request stage timings are also collected in a context variable so a
+# response can carry them in a Server-Timing header.
+# -------------------------
+
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = registry.lock
+        registry.register(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def snapshot(self):
+        return [[list(k), v] for k, v in self.values.items()]
+
+    def merge(self, merged, samples):
+        for labels, value in samples:
+            key = tuple(labels)
+            merged[key] = merged.get(key, 0) + value
+
+    def lines(self, values):
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}  # labels -> [count per bucket..., +Inf count, sum]
+        self._lock = registry.lock
+        registry.register(self)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        return [[list(k), list(v)] for k, v in self.values.items()]
+
+    def merge(self, merged, samples):
+        for labels, series in samples:
+            key = tuple(labels)
+            if key in merged:
+                merged[key] = [a + b for a, b in zip(merged[key], series)]
+            else:
+                merged[key] = list(series)
+
+    def lines(self, values):
+        for labels, series in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                extra = [('le', bound if bound == '+Inf' else _number(float(bound)))]
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, extra)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    # Read from a callback at scrape time: fn() -> number or {labels tuple: number}
+    kind = 'gauge'
+
+    def __init__(self, registry, name, help, fn, labelnames=(), merge='sum'):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.merge_mode = merge
+        registry.register(self)
+
+    def snapshot(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if isinstance(value, dict):
+            return [[list(k), v] for k, v in value.items()]
+        return [[[], value]]
+
+    def merge(self, merged, samples):
+        for labels, value in samples:
+            key = tuple(labels)
+            if key not in merged:
+                merged[key] = value
+            elif self.merge_mode == 'max':
+                merged[key] = max(merged[key], value)
+            else:
+                merged[key] += value
+
+    def lines(self, values):
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Registry:
+    def __init__(self, directory=None, flush_interval=5.0):
+        self.lock = threading.Lock()
+        self.metrics = []
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._thread = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def counter(self, name, help, labelnames=()):
+        return Counter(self, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return Histogram(self, name, help, labelnames, buckets)
+
+    def gauge(self, name, help, fn, labelnames=(), merge='sum'):
+        return Gauge(self, name, help, fn, labelnames, merge)
+
+    # -------------------------
+    # Multi-worker aggregation
+    # -------------------------
+    def snapshot(self):
+        with self.lock:
+            counters = {m.name: m.snapshot() for m in self.metrics if m.kind != 'gauge'}
+        gauges = {m.name: m.snapshot() for m in self.metrics if m.kind == 'gauge'}
+        return {'pid': os.getpid(), 'time': time.time(), 'metrics': {**counters, **gauges}}
+
+    def flush(self):
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Metrics flush error: {str(e)}")
+
+    def start(self):
+        # Background snapshots; only needed when aggregating across workers
+        if not self.directory or self._thread is not None:
+            return
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+                self._thread.start()
+
+    def _snapshots(self):
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                continue
+        return snapshots
+
+    def render(self):
+        snapshots = self._snapshots()
+        out = []
+        for metric in self.metrics:
+            merged = {}
+            for snapshot in snapshots:
+                # Counters of exited workers still count; their gauges do not
+                if metric.kind == 'gauge' and not _alive(snapshot['pid']):
+                    continue
+                metric.merge(merged, snapshot['metrics'].get(metric.name, []))
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines(merged))
+        return '\n'.join(out) + '\n'
+
+
+def _alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# -------------------------
+# Stage timing
+# -------------------------
+class Timer:
+    # with Timer(histogram, 'spell'): ... -> one observation, plus the
+    # request's Server-Timing entry when one is being collected
+    __slots__ = ('histogram', 'stage', 'start', 'elapsed')
+
+    def __init__(self, histogram, stage):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        observe_stage(self.histogram, self.stage, self.elapsed)
+        return False
+
+
+def observe_stage(histogram, stage, elapsed):
+    histogram.observe(elapsed, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, elapsed))
+
+
+def begin_request():
+    timings = []
+    return _request_timings.set(timings), timings
+
+
+def end_request(token):
+    _request_timings.reset(token)
+
+
+def server_timing(timings):
+    # Same stage twice (e.g. two spell passes) is summed
+    totals = {}
+    for stage, elapsed in timings:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return ', '.join(f"{stage};dur={elapsed * 1000:.2f}" for stage, elapsed in totals.items())
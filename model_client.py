@@ -0,0 +1,110 @@
+import string
+import threading
+import time
+
+# -------------------------
+# Shared Gemini client
+#
+# One GenerativeModel per prompt kind, created once per worker with its
+# fixed instructions as the system instruction (the static part of every
+# prompt is built once, and a stable prefix is what Gemini's implicit
+# context caching can reuse). Per request only the query and retrieved
+# passages are interpolated into a precompiled template.
+#
+# google.generativeai (and grpc under it) is imported on first model use,
+# not at import time: it is the slowest import of the app, and a gunicorn
+# master that preloads the app should never initialise grpc before forking.
+# -------------------------
+
+MODEL_NAME = 'gemini-2.5-flash'  # Updated to latest stable model
+
+_sdk = None
+_sdk_options = {}
+_sdk_lock = threading.Lock()
+
+
+def configure(**options):
+    # genai.configure() options, applied when the SDK is first imported
+    _sdk_options.update(options)
+    if _sdk is not None:
+        _sdk.configure(**_sdk_options)
+
+
+def sdk():
+    global _sdk
+    if _sdk is None:
+        with _sdk_lock:
+            if _sdk is None:
+                import google.generativeai as genai
+                genai.configure(**_sdk_options)
+                _sdk = genai
+    return _sdk
+
+
+class PromptTemplate:
+    # str.format-style template, parsed once: rendering is a join of
+    # literal chunks and the given values
+    def __init__(self, text):
+        self.parts = []
+        self.fields = []
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if spec or conversion:
+                raise ValueError(f"Unsupported format spec in prompt field {field!r}")
+            self.parts.append(literal)
+            self.fields.append(field)
+
+    def render(self, **values):
+        out = []
+        for literal, field in zip(self.parts, self.fields):
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return ''.join(out)
+
+
+class ModelClient:
+    def __init__(self, instructions, model_name=MODEL_NAME):
+        # instructions: {kind: system instruction text}
+        self.model_name = model_name
+        self.instructions = dict(instructions)
+        self._models = None
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    @property
+    def models(self):
+        # Built on first use, which also imports the SDK
+        if self._models is None:
+            with self._lock:
+                if self._models is None:
+                    genai = sdk()
+                    self._models = {
+                        kind: genai.GenerativeModel(self.model_name, system_instruction=instruction)
+                        for kind, instruction in self.instructions.items()
+                    }
+        return self._models
+
+    def model(self, kind):
+        return self.models[kind]
+
+    def generate(self, kind, prompt, stream=False, timeout=None):
+        # With a timeout the client's own 503 retries (backoff for up to
+        # 10 minutes) are disabled too: the caller decides what a failure means
+        request_options = {'timeout': timeout, 'retry': None} if timeout else None
+        return self.models[kind].generate_content(prompt, stream=stream, request_options=request_options)
+
+    def warmup(self):
+        # Opens the connection (DNS, TLS, channel setup) before the first
+        # user request needs it; count_tokens is not billed as generation
+        start = time.perf_counter()
+        try:
+            next(iter(self.models.values())).count_tokens("warmup")
+        except Exception as e:
+            print(f"Model warmup failed: {str(e)}")
+            return False
+        self.warmed = True
+        print(f"Model client warmed up in {time.perf_counter() - start:.2f}s")
+        return True
+
+    def start_warmup(self):
+        threading.Thread(target=self.warmup, name='model-warmup', daemon=True).start()
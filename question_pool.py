@@ -0,0 +1,199 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: every process refills on its own
+    fcntl = None
+
+from answer_cache import fold_query
+
+# -------------------------
+# Quiz question pool
+#
+# Questions are served from memory; a background thread tops the pool up
+# with large batched Gemini calls and persists it to disk so restarts are
+# warm. Each entry carries its reference answer, computed once when the
+# question enters the pool, so grading never regenerates it, and the
+# fingerprint of the knowledge it was computed from: after a knowledge
+# reload, answers from an older version are no longer served and the
+# refill thread regenerates them. With several
+# gunicorn workers only the one holding the lock file generates, the
+# others pick its results up from disk.
+# -------------------------
+
+FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+
+def parse_question_list(text):
+    # Accepts a JSON array of strings or {"question": ..., "answer": ...}, optionally fenced
+    text = FENCE_RE.sub('', text.strip())
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end <= start:
+        return []
+    try:
+        items = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return []
+    entries = []
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, str):
+            item = {"question": item}
+        if not isinstance(item, dict) or not isinstance(item.get('question'), str):
+            continue
+        entry = {"question": item['question'].strip()}
+        if isinstance(item.get('answer'), str) and item['answer'].strip():
+            entry["answer"] = item['answer'].strip()
+        if entry["question"]:
+            entries.append(entry)
+    return entries
+
+
+class QuestionPool:
+    def __init__(self, path, generate_batch, answer_question, seed_questions=(),
+                 target_size=100, batch_size=20, interval=30, version=None):
+        # version: knowledge fingerprint the reference answers must match
+        self.path = path
+        self.generate_batch = generate_batch
+        self.answer_question = answer_question
+        self.target_size = target_size
+        self.batch_size = batch_size
+        self.interval = interval
+        self.version = version
+        self._entries = []  # list of {"question": ..., "answer": ...}, replaced wholesale on update
+        self._by_key = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.add(seed_questions)
+        self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -------------------------
+    # Contents
+    # -------------------------
+    def _fresh(self, entry):
+        # Has a reference answer computed from the current knowledge
+        return bool(entry.get("answer")) and entry.get("knowledge") == self.version
+
+    def _merge(self, entries):
+        added = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"question": entry}
+            key = fold_query(entry.get("question", ""))
+            if not key:
+                continue
+            known = self._by_key.get(key)
+            if known is None:
+                entry = dict(entry)
+                self._by_key[key] = entry
+                added.append(entry)
+            elif entry.get("answer") and not self._fresh(known) and (self._fresh(entry) or not known.get("answer")):
+                known["answer"] = entry["answer"]
+                known["knowledge"] = entry.get("knowledge")
+        if added:
+            self._entries = self._entries + added
+        return added
+
+    def add(self, questions):
+        with self._lock:
+            return self._merge(questions)
+
+    def sample(self, n=5):
+        entries = self._entries
+        return random.sample(entries, min(n, len(entries)))
+
+    def reference_answer(self, question):
+        entry = self._by_key.get(fold_query(question))
+        return entry["answer"] if entry and self._fresh(entry) else None
+
+    def set_version(self, version):
+        # Called when the knowledge files change; older answers go stale
+        self.version = version
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _read_file(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, list) else []
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def load(self):
+        return self.add(self._read_file())
+
+    def save(self):
+        with self._lock:
+            # Keep whatever other workers persisted meanwhile
+            self._merge(self._read_file())
+            entries = self._entries
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # -------------------------
+    # Background refill
+    # -------------------------
+    def fill_answers(self, limit):
+        # Reference answers for seeded/legacy entries that arrived without
+        # one, and for answers computed from an older knowledge version
+        filled = 0
+        for entry in self._entries:
+            if filled >= limit:
+                break
+            if not self._fresh(entry):
+                version = self.version
+                answer = self.answer_question(entry["question"])
+                if answer:
+                    entry["answer"] = answer
+                    entry["knowledge"] = version
+                    filled += 1
+        return filled
+
+    def refill_once(self):
+        added = []
+        if len(self) < self.target_size:
+            version = self.version
+            added = self.add([
+                dict(entry, knowledge=version) if isinstance(entry, dict) and entry.get("answer") else entry
+                for entry in self.generate_batch(self.batch_size)
+            ])
+        filled = self.fill_answers(self.batch_size)
+        if added or filled:
+            self.save()
+        return len(added)
+
+    def _run(self):
+        lock_file = None
+        while True:
+            try:
+                if fcntl is not None and lock_file is None:
+                    candidate = open(f"{self.path}.lock", 'w')
+                    try:
+                        fcntl.flock(candidate, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        lock_file = candidate
+                    except OSError:
+                        candidate.close()
+                if fcntl is None or lock_file is not None:
+                    self.refill_once()
+                else:
+                    self.load()
+            except Exception as e:
+                print(f"Question pool refill error: {str(e)}")
+            time.sleep(self.interval)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="question-pool", daemon=True)
+                self._thread.start()
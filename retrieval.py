@@ -0,0 +1,135 @@
+import json
+import re
+
+import numpy as np
+
+# -------------------------
+# Local passage retrieval for Gemini prompts
+#
+# The knowledge files are chunked into small JSON passages and scored with
+# BM25 over a dense NumPy weight matrix, so only the passages relevant to a
+# query are sent to the model. Runs fully offline.
+# -------------------------
+
+TOKEN_RE = re.compile(r'\w+')
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me of on or "
+    "tell the their this to what when where which who why with you your".split()
+)
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    # Rough Gemini token estimate (~4 bytes per token)
+    return len(text.encode('utf-8')) // 4 + 1
+
+
+def compact_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+# -------------------------
+# Chunking
+# -------------------------
+def chunk_json(data, source, max_chars=800):
+    passages = []
+
+    def _flush(path, buffer):
+        if buffer:
+            passages.append({"source": source, "path": path, "text": compact_json(buffer)})
+
+    def _chunk(obj, path):
+        text = compact_json(obj)
+        if len(text) <= max_chars or not isinstance(obj, (dict, list)):
+            passages.append({"source": source, "path": path, "text": text})
+            return
+        # Pack small children together, recurse into the large ones
+        is_dict = isinstance(obj, dict)
+        items = obj.items() if is_dict else enumerate(obj)
+        buffer, size = ({} if is_dict else []), 0
+        for key, value in items:
+            child_path = f"{path}.{key}" if is_dict else f"{path}[{key}]"
+            child_path = child_path.lstrip('.')
+            child_size = len(compact_json(value))
+            if child_size > max_chars and isinstance(value, (dict, list)):
+                _chunk(value, child_path)
+                continue
+            if size + child_size > max_chars:
+                _flush(path, buffer)
+                buffer, size = ({} if is_dict else []), 0
+            if is_dict:
+                buffer[key] = value
+            else:
+                buffer.append(value)
+            size += child_size
+        _flush(path, buffer)
+
+    _chunk(data, "")
+    return passages
+
+
+# -------------------------
+# BM25 retriever
+# -------------------------
+class ContextRetriever:
+    def __init__(self, passages, k1=1.5, b=0.75):
+        self.passages = passages
+        self.texts = [f"{p['path'] or p['source']}: {p['text']}" for p in passages]
+        self.sizes = np.array([len(t.encode('utf-8')) for t in self.texts], dtype=np.int64)
+
+        self.vocab = {}
+        rows, cols = [], []
+        for row, passage in enumerate(passages):
+            for token in tokenize(passage['path'] + " " + passage['text']):
+                rows.append(row)
+                cols.append(self.vocab.setdefault(token, len(self.vocab)))
+
+        n_docs = max(len(passages), 1)
+        tf = np.zeros((n_docs, max(len(self.vocab), 1)), dtype=np.float32)
+        np.add.at(tf, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+        doc_len = tf.sum(axis=1)
+        avg_len = doc_len.mean() or 1.0
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * doc_len / avg_len)
+        # Precomputed BM25 term weights: a query score is a column sum
+        self.weights = idf * tf * (k1 + 1) / (tf + norm[:, None])
+
+    def scores(self, query):
+        ids = sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab})
+        if not ids:
+            return np.zeros(len(self.passages), dtype=np.float32)
+        return self.weights[:, ids].sum(axis=1)
+
+    def _pack(self, order, token_budget, top_k):
+        chosen, used = [], 0
+        for idx in order:
+            cost = estimate_tokens(self.texts[idx])
+            if used + cost > token_budget:
+                continue
+            chosen.append(int(idx))
+            used += cost
+            if len(chosen) >= top_k:
+                break
+        return chosen
+
+    def select(self, query, token_budget=1500, top_k=8):
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if hits.size:
+            order = hits[np.argsort(-scores[hits], kind='stable')]
+        else:
+            # Nothing matched: fall back to the document overview passages
+            order = np.arange(len(self.passages))
+        return self._pack(order, token_budget, top_k)
+
+    def sample(self, token_budget=1500, top_k=8, rng=None):
+        # Random spread of passages, e.g. for quiz generation
+        rng = rng or np.random.default_rng()
+        return self._pack(rng.permutation(len(self.passages)), token_budget, top_k)
+
+    def render(self, indices):
+        return "\n".join(self.texts[i] for i in indices)
@@ -1,16 +1,27 @@
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import argparse
+import os
+import threading
 import time
 import logging
 import json
+import queue
 import re
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # Fall back to BeautifulSoup's html.parser
+    lxml = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -29,15 +40,22 @@ start_urls = [
     "/blog/"
 ]
 
-# Set to store visited URLs and queue for crawling
-visited_urls = set()
-url_queue = deque(start_urls)
 max_pages = 300  # Increased to cover all pages and subpages
 
-# Set up requests session with retries
+# Crawl concurrency and politeness (per-host token bucket)
+default_workers = 8
+default_rate = 2.0   # Requests per second per host
+default_burst = 4
+pages_file = "crawl_pages.jsonl"  # One record per page; also the incremental re-crawl state
+output_file = "ubik_data.json"
+checkpoint_interval = 10  # Pages between frontier/visited checkpoints
+
+# Set up requests session with retries (shared by all worker threads)
 session = requests.Session()
 retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-session.mount("https://", HTTPAdapter(max_retries=retries))
+adapter = HTTPAdapter(max_retries=retries, pool_maxsize=32)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
 
 # Optional: Selenium setup for dynamic content
 def setup_selenium():
@@ -47,171 +65,631 @@ def setup_selenium():
     driver = webdriver.Chrome(options=options)
     return driver
 
+# Headless Chrome is expensive to start, so drivers are reused across pages
+driver_pool = queue.Queue()
+all_drivers = []
+
+def acquire_driver():
+    try:
+        return driver_pool.get_nowait()
+    except queue.Empty:
+        driver = setup_selenium()
+        all_drivers.append(driver)
+        return driver
+
+def release_driver(driver):
+    driver_pool.put(driver)
+
+def close_drivers():
+    while all_drivers:
+        try:
+            all_drivers.pop().quit()
+        except Exception as e:
+            logging.warning(f"Failed to close Chrome driver: {str(e)}")
+    while not driver_pool.empty():
+        driver_pool.get_nowait()
+
+# Per-host token bucket rate limiting
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+class HostRateLimiter:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.setdefault(host, TokenBucket(self.rate, self.burst))
+        bucket.acquire()
+
 # Normalize and validate URLs
-def normalize_url(url):
-    return urljoin(base_url, url.strip())
+def normalize_url(url, base=None):
+    return urljoin(base or base_url, url.strip())
 
-def is_valid_url(url):
+def is_valid_url(url, base=None):
     # Exclude invalid URLs (e.g., Cloudflare email protection, anchors, non-content files)
-    if url in visited_urls or "cdn-cgi/l/email-protection" in url or url.endswith(('#', '#top')):
+    if "cdn-cgi/l/email-protection" in url or url.endswith(('#', '#top')):
         return False
     if url.startswith(('mailto:', 'tel:', 'javascript:')):
         return False
     if url.endswith(('.jpg', '.png', '.pdf', '.css', '.js')):
         return False
-    return url.startswith(base_url)
+    return url.startswith(base or base_url)
 
 # Extract links from a page
-def extract_links(soup, current_url):
+def extract_links(soup, current_url, base=None):
     links = set()
     for a_tag in soup.find_all('a', href=True):
         href = a_tag['href']
-        full_url = normalize_url(href)
-        if is_valid_url(full_url):
+        full_url = normalize_url(href, base)
+        if is_valid_url(full_url, base):
             links.add(full_url)
     return links
 
-# Scrape a page with structured product, service, and content extraction
-def scrape_page(url, use_selenium=False):
-    try:
-        if use_selenium:
-            driver = setup_selenium()
+# Fetch a page, conditionally if we have validators from a previous crawl.
+# Returns (html or None if unchanged, validators)
+def fetch_page(url, validators=None, use_selenium=False):
+    if use_selenium:
+        driver = acquire_driver()
+        try:
             driver.get(url)
             time.sleep(5)  # Wait for JavaScript to load
-            page_source = driver.page_source
-            driver.quit()
-            soup = BeautifulSoup(page_source, "html.parser")
-        else:
-            response = session.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-
-        # Structured data dictionary
-        data = {
-            'url': url,
-            'title': soup.title.get_text(strip=True) if soup.title else '',
-            'meta_description': soup.find('meta', attrs={'name': 'description'})['content'] if soup.find('meta', attrs={'name': 'description'}) else '',
-            'category': url.split('/product-category/')[-1].strip('/') or 'general' if 'product-category' in url else url.split('/')[-2] or 'general',
-            'products': [],
-            'services': [],
-            'sections': [],
-            'links': []
-        }
+            return driver.page_source, {}
+        finally:
+            release_driver(driver)
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    validators = validators or {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    response = session.get(url, timeout=10, headers=headers)
+    if response.status_code == 304:
+        return None, validators
+    response.raise_for_status()
+    return response.text, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
+    }
 
-        # Extract product details (for /product-category/ and product pages)
-        product_sections = soup.find_all(['div', 'article', 'li'], class_=re.compile('product|item|card|woocommerce|entry|product-card', re.I))
-        for section in product_sections:
-            product = {}
-            # Product name
-            name = section.find(['h1', 'h2', 'h3', 'h4', 'span'], class_=re.compile('title|name|product-title|woocommerce-loop-product__title|entry-title', re.I))
-            product['name'] = name.get_text(strip=True) if name else ''
-            # Product description
-            desc = section.find(['p', 'div'], class_=re.compile('description|content|excerpt|summary|woocommerce-product-details__short-description', re.I))
-            product['description'] = desc.get_text(strip=True) if desc else ''
-            # Product price
-            price = section.find(class_=re.compile('price|amount|woocommerce-Price-amount', re.I))
-            product['price'] = price.get_text(strip=True) if price else ''
-            # Product ingredients
-            ingredients = section.find(['p', 'div', 'ul'], class_=re.compile('ingredients|composition|key-ingredients', re.I))
-            product['ingredients'] = ingredients.get_text(strip=True) if ingredients else ''
-            # Product category
-            product['category'] = data['category']
-            if product['name']:  # Only add if product name exists
-                data['products'].append(product)
-
-        # Extract service details (for /services/ and subpages like /idoc-academy/)
-        service_sections = soup.find_all(['div', 'section', 'article'], class_=re.compile('service|solutions|idoc|brandyou|vistaderm|academy', re.I))
-        for section in service_sections:
-            service = {}
-            # Service name
-            name = section.find(['h1', 'h2', 'h3', 'h4'], class_=re.compile('title|name|service-title', re.I))
-            service['name'] = name.get_text(strip=True) if name else ''
-            # Service description
-            desc = section.find(['p', 'div'], class_=re.compile('description|content|summary', re.I))
-            service['description'] = desc.get_text(strip=True) if desc else ''
-            # Service features
-            features = section.find(['ul', 'div'], class_=re.compile('features|benefits', re.I))
-            service['features'] = features.get_text(strip=True) if features else ''
-            if service['name']:  # Only add if service name exists
-                data['services'].append(service)
-
-        # Extract general page content (for Global Presence, Resources, Investor, etc.)
-        for header in soup.find_all(['h1', 'h2', 'h3']):
-            section_content = []
-            next_element = header.find_next()
-            while next_element and next_element.name not in ['h1', 'h2', 'h3']:
-                if next_element.name in ['p', 'div', 'span', 'ul', 'li'] and next_element.get_text(strip=True):
-                    section_content.append(next_element.get_text(strip=True))
-                next_element = next_element.find_next()
-            if section_content:
-                data['sections'].append({
-                    'header': header.get_text(strip=True),
-                    'content': ' '.join(section_content)
-                })
-
-        # Extract contact information (for /contact-us/)
-        contact_info = soup.find(['div', 'section'], class_=re.compile('contact|footer|info', re.I))
-        if contact_info:
-            data['contact'] = {
-                'text': contact_info.get_text(strip=True),
-                'emails': re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', contact_info.get_text()),
-                'phones': re.findall(r'\+?\d{1,4}[\s.-]?\d{3}[\s.-]?\d{3,4}[\s.-]?\d{3,4}', contact_info.get_text())
-            }
-
-        # Extract pagination links
-        pagination = soup.find_all('a', class_=re.compile('next|page-numbers|pagination|woocommerce-pagination', re.I))
-        for page in pagination:
-            page_url = normalize_url(page['href'])
-            if is_valid_url(page_url):
-                data['links'].append(page_url)
-
-        # Extract all links for further crawling
-        data['links'].extend(extract_links(soup, url))
-        return data
+# Scrape a page with structured product, service, and content extraction
+def scrape_page(url, use_selenium=False, base=None):
+    try:
+        html, _ = fetch_page(url, use_selenium=use_selenium)
+        return parse_page(url, html, base)
     except Exception as e:
         logging.error(f"Failed to scrape {url}: {str(e)}")
         return None
 
-# Crawl the website
-scraped_data = {
-    'products': [],  # Consolidated product list
-    'services': [],  # Consolidated service list
-    'pages': {}     # Other page content
-}
-while url_queue and len(visited_urls) < max_pages:
-    path = url_queue.popleft()
-    full_url = normalize_url(path)
-    if full_url in visited_urls:
-        continue
-
-    logging.info(f"Scraping {full_url}")
-    page_data = scrape_page(full_url, use_selenium=False)  # Set to True if dynamic content is needed
-    if page_data:
-        # Add products to consolidated list
-        for product in page_data['products']:
-            if product not in scraped_data['products']:  # Avoid duplicates
-                scraped_data['products'].append(product)
-        # Add services to consolidated list
-        for service in page_data['services']:
-            if service not in scraped_data['services']:  # Avoid duplicates
-                scraped_data['services'].append(service)
-        # Store page content
-        scraped_data['pages'][full_url] = {
-            'title': page_data['title'],
-            'meta_description': page_data['meta_description'],
-            'category': page_data['category'],
-            'sections': page_data['sections'],
-            'contact': page_data.get('contact', {}),
-            'links': page_data['links']
+# Class patterns for the structured extraction
+PRODUCT_CLASS = re.compile('product|item|card|woocommerce|entry|product-card', re.I)
+PRODUCT_FIELDS = [
+    ('name', ('h1', 'h2', 'h3', 'h4', 'span'), re.compile('title|name|product-title|woocommerce-loop-product__title|entry-title', re.I)),
+    ('description', ('p', 'div'), re.compile('description|content|excerpt|summary|woocommerce-product-details__short-description', re.I)),
+    ('price', None, re.compile('price|amount|woocommerce-Price-amount', re.I)),
+    ('ingredients', ('p', 'div', 'ul'), re.compile('ingredients|composition|key-ingredients', re.I)),
+]
+SERVICE_CLASS = re.compile('service|solutions|idoc|brandyou|vistaderm|academy', re.I)
+SERVICE_FIELDS = [
+    ('name', ('h1', 'h2', 'h3', 'h4'), re.compile('title|name|service-title', re.I)),
+    ('description', ('p', 'div'), re.compile('description|content|summary', re.I)),
+    ('features', ('ul', 'div'), re.compile('features|benefits', re.I)),
+]
+CONTACT_CLASS = re.compile('contact|footer|info', re.I)
+PAGINATION_CLASS = re.compile('next|page-numbers|pagination|woocommerce-pagination', re.I)
+HEADER_TAGS = ('h1', 'h2', 'h3')
+SECTION_TEXT_TAGS = ('p', 'div', 'span', 'ul', 'li')
+SKIP_TEXT_TAGS = ('script', 'style', 'noscript', 'template', 'head')
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'\+?\d{1,4}[\s.-]?\d{3}[\s.-]?\d{3,4}[\s.-]?\d{3,4}')
+
+# Document events ('start', tag, attrs, node) / ('text', str) / ('end', tag, node)
+def lxml_events(html):
+    try:
+        root = lxml.html.fromstring(html)
+    except ValueError:  # str input with an XML encoding declaration
+        root = lxml.html.fromstring(html.encode('utf-8'))
+    for event, el in etree.iterwalk(root, events=('start', 'end')):
+        is_element = isinstance(el.tag, str)
+        if event == 'start':
+            if is_element:
+                yield 'start', el.tag.lower(), el.attrib, el
+                if el.text:
+                    yield 'text', el.text
+        else:
+            if is_element:
+                yield 'end', el.tag.lower(), el
+            if el.tail:
+                yield 'text', el.tail
+
+def soup_events(html):
+    def _walk(node):
+        for child in node.children:
+            if getattr(child, 'name', None) is None:
+                if type(child).__name__ == 'NavigableString':  # Skip comments, doctype, etc.
+                    yield 'text', str(child)
+                continue
+            attrs = {k: ' '.join(v) if isinstance(v, list) else v for k, v in child.attrs.items()}
+            yield 'start', child.name, attrs, child
+            yield from _walk(child)
+            yield 'end', child.name, child
+    yield from _walk(BeautifulSoup(html, "html.parser"))
+
+def node_text(node, separator=''):
+    # Equivalent of BeautifulSoup's get_text(separator, strip=True)
+    if lxml is not None and isinstance(node, etree._Element):
+        return separator.join(t.strip() for t in node.itertext() if t.strip())
+    return node.get_text(separator, strip=True)
+
+# Single-pass extraction: products, services, sections, contact and links
+# are all collected in one walk over the document
+def parse_page(url, html, base=None):
+    category = url.split('/product-category/')[-1].strip('/') or 'general' if 'product-category' in url else url.split('/')[-2] or 'general'
+    data = {
+        'url': url,
+        'title': '',
+        'meta_description': '',
+        'category': category,
+        'products': [],
+        'services': [],
+        'sections': [],
+        'links': []
+    }
+    links = set()
+    found = []       # Products/services in document order: (kind, fields)
+    containers = []  # Open product/service elements: [kind, node, fields, field specs]
+    section = None   # Current header section: [header, content parts]
+    text_depth = 0   # Open p/div/span/ul/li elements
+    skip_depth = 0   # Open script/style elements
+    contact_node = None
+    in_title = False
+
+    def close_section():
+        if section and section[1]:
+            data['sections'].append({'header': section[0], 'content': ' '.join(section[1])})
+
+    for event in (lxml_events if lxml is not None else soup_events)(html):
+        kind = event[0]
+        if kind == 'text':
+            if in_title and not data['title']:
+                data['title'] = event[1].strip()
+            elif section is not None and text_depth and not skip_depth and event[1].strip():
+                section[1].append(event[1].strip())
+            continue
+
+        tag, node = event[1], event[-1]
+        if kind == 'end':
+            if tag in SECTION_TEXT_TAGS:
+                text_depth -= 1
+            elif tag in SKIP_TEXT_TAGS or tag in HEADER_TAGS:
+                skip_depth -= 1
+            if tag == 'title':
+                in_title = False
+            while containers and containers[-1][1] is node:
+                containers.pop()
+            continue
+
+        attrs = event[2]
+        classes = attrs.get('class', '') or ''
+        # Fill the first matching field of every open container (like section.find())
+        for _, _, fields, specs in containers:
+            for field, tags, pattern in specs:
+                if fields[field] is None and (tags is None or tag in tags) and classes and pattern.search(classes):
+                    fields[field] = node_text(node)
+        if tag == 'title':
+            in_title = True
+        elif tag == 'meta' and (attrs.get('name') or '').lower() == 'description' and not data['meta_description']:
+            data['meta_description'] = attrs.get('content', '')
+        elif tag == 'a' and attrs.get('href'):
+            link = normalize_url(attrs['href'], base)
+            if is_valid_url(link, base):
+                if classes and PAGINATION_CLASS.search(classes):
+                    data['links'].append(link)
+                links.add(link)
+        if tag in HEADER_TAGS:
+            close_section()
+            section = [node_text(node), []]
+            skip_depth += 1  # Header text is the section title, not its content
+        if classes:
+            for container_kind, container_tags, pattern, specs in (
+                    ('products', ('div', 'article', 'li'), PRODUCT_CLASS, PRODUCT_FIELDS),
+                    ('services', ('div', 'section', 'article'), SERVICE_CLASS, SERVICE_FIELDS)):
+                if tag in container_tags and pattern.search(classes):
+                    fields = dict.fromkeys(field for field, _, _ in specs)
+                    containers.append([container_kind, node, fields, specs])
+                    found.append((container_kind, fields))
+            if contact_node is None and tag in ('div', 'section') and CONTACT_CLASS.search(classes):
+                contact_node = node
+        if tag in SECTION_TEXT_TAGS:
+            text_depth += 1
+        elif tag in SKIP_TEXT_TAGS:
+            skip_depth += 1
+    close_section()
+
+    # Missing fields are empty strings, as in the multi-pass extractor
+    for container_kind, fields in found:
+        if not fields['name']:  # Only add if a name exists
+            continue
+        item = {field: value or '' for field, value in fields.items()}
+        if container_kind == 'products':
+            item['category'] = category
+        data[container_kind].append(item)
+    if contact_node is not None:
+        text = node_text(contact_node)
+        spaced = node_text(contact_node, ' ')
+        data['contact'] = {'text': text, 'emails': EMAIL_RE.findall(spaced), 'phones': PHONE_RE.findall(spaced)}
+    data['links'].extend(links)
+    return data
+
+# Previous multi-pass extractor (find_all scans + find_next walks per header),
+# kept as the baseline for bench_scrape.py
+def parse_page_multipass(url, html, base=None):
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Structured data dictionary
+    data = {
+        'url': url,
+        'title': soup.title.get_text(strip=True) if soup.title else '',
+        'meta_description': soup.find('meta', attrs={'name': 'description'})['content'] if soup.find('meta', attrs={'name': 'description'}) else '',
+        'category': url.split('/product-category/')[-1].strip('/') or 'general' if 'product-category' in url else url.split('/')[-2] or 'general',
+        'products': [],
+        'services': [],
+        'sections': [],
+        'links': []
+    }
+
+    # Extract product details (for /product-category/ and product pages)
+    product_sections = soup.find_all(['div', 'article', 'li'], class_=re.compile('product|item|card|woocommerce|entry|product-card', re.I))
+    for section in product_sections:
+        product = {}
+        # Product name
+        name = section.find(['h1', 'h2', 'h3', 'h4', 'span'], class_=re.compile('title|name|product-title|woocommerce-loop-product__title|entry-title', re.I))
+        product['name'] = name.get_text(strip=True) if name else ''
+        # Product description
+        desc = section.find(['p', 'div'], class_=re.compile('description|content|excerpt|summary|woocommerce-product-details__short-description', re.I))
+        product['description'] = desc.get_text(strip=True) if desc else ''
+        # Product price
+        price = section.find(class_=re.compile('price|amount|woocommerce-Price-amount', re.I))
+        product['price'] = price.get_text(strip=True) if price else ''
+        # Product ingredients
+        ingredients = section.find(['p', 'div', 'ul'], class_=re.compile('ingredients|composition|key-ingredients', re.I))
+        product['ingredients'] = ingredients.get_text(strip=True) if ingredients else ''
+        # Product category
+        product['category'] = data['category']
+        if product['name']:  # Only add if product name exists
+            data['products'].append(product)
+
+    # Extract service details (for /services/ and subpages like /idoc-academy/)
+    service_sections = soup.find_all(['div', 'section', 'article'], class_=re.compile('service|solutions|idoc|brandyou|vistaderm|academy', re.I))
+    for section in service_sections:
+        service = {}
+        # Service name
+        name = section.find(['h1', 'h2', 'h3', 'h4'], class_=re.compile('title|name|service-title', re.I))
+        service['name'] = name.get_text(strip=True) if name else ''
+        # Service description
+        desc = section.find(['p', 'div'], class_=re.compile('description|content|summary', re.I))
+        service['description'] = desc.get_text(strip=True) if desc else ''
+        # Service features
+        features = section.find(['ul', 'div'], class_=re.compile('features|benefits', re.I))
+        service['features'] = features.get_text(strip=True) if features else ''
+        if service['name']:  # Only add if service name exists
+            data['services'].append(service)
+
+    # Extract general page content (for Global Presence, Resources, Investor, etc.)
+    for header in soup.find_all(['h1', 'h2', 'h3']):
+        section_content = []
+        next_element = header.find_next()
+        while next_element and next_element.name not in ['h1', 'h2', 'h3']:
+            if next_element.name in ['p', 'div', 'span', 'ul', 'li'] and next_element.get_text(strip=True):
+                section_content.append(next_element.get_text(strip=True))
+            next_element = next_element.find_next()
+        if section_content:
+            data['sections'].append({
+                'header': header.get_text(strip=True),
+                'content': ' '.join(section_content)
+            })
+
+    # Extract contact information (for /contact-us/)
+    contact_info = soup.find(['div', 'section'], class_=re.compile('contact|footer|info', re.I))
+    if contact_info:
+        data['contact'] = {
+            'text': contact_info.get_text(strip=True),
+            'emails': re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', contact_info.get_text()),
+            'phones': re.findall(r'\+?\d{1,4}[\s.-]?\d{3}[\s.-]?\d{3,4}[\s.-]?\d{3,4}', contact_info.get_text())
         }
-        visited_urls.add(full_url)
-        for link in page_data['links']:
-            if is_valid_url(link) and link not in url_queue:
-                url_queue.append(link)
-    time.sleep(1.5)  # Polite delay
 
-# Save comprehensive data to JSON
-with open("ubik_data.json", "w", encoding="utf-8") as f:
-    json.dump(scraped_data, f, indent=2, ensure_ascii=False)
+    # Extract pagination links
+    pagination = soup.find_all('a', class_=re.compile('next|page-numbers|pagination|woocommerce-pagination', re.I))
+    for page in pagination:
+        page_url = normalize_url(page.get('href', ''), base)
+        if is_valid_url(page_url, base):
+            data['links'].append(page_url)
+
+    # Extract all links for further crawling
+    data['links'].extend(extract_links(soup, url, base))
+    return data
+
+# Previous crawl output (JSONL, one record per page): validators stay in
+# memory, parsed pages are read back from disk only when a page is unchanged
+class PageArchive:
+    def __init__(self, path):
+        self.path = path
+        self.offsets = {}
+        self.validators = {}
+        self.lock = threading.Lock()
+        self.file = None
+        if path and os.path.exists(path):
+            self.file = open(path, 'rb')
+            for offset, record in iter_records(self.file):
+                self.offsets[record['url']] = offset
+                self.validators[record['url']] = record.get('validators')
+
+    def get(self, url):
+        if url not in self.offsets:
+            return None
+        with self.lock:
+            self.file.seek(self.offsets[url])
+            record = json.loads(self.file.readline())
+        return {'validators': record.get('validators'), 'page': record['page']}
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+# (offset, record) for every complete line; stops at a torn trailing line
+def iter_records(f, start=0):
+    f.seek(start)
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line.endswith(b'\n'):
+            return
+        try:
+            yield offset, json.loads(line)
+        except json.JSONDecodeError:
+            return
+
+def load_checkpoint(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+# Fetch + parse one URL; unchanged pages (304) reuse the previous parse
+def crawl_page(url, previous, limiter, use_selenium, base, html_dir=None):
+    limiter.acquire(url)
+    try:
+        html, validators = fetch_page(url, previous.get('validators') if previous else None, use_selenium)
+        if html is None and previous:
+            return previous['page'], previous['validators'], False
+        if html_dir:
+            # Raw pages double as fixtures for benchmarks/bench_scrape.py
+            name = re.sub(r'[^A-Za-z0-9]+', '_', urlparse(url).path).strip('_') or 'index'
+            with open(os.path.join(html_dir, f"{name}.html"), 'w', encoding='utf-8') as f:
+                f.write(html)
+        return parse_page(url, html, base), validators, True
+    except Exception as e:
+        logging.error(f"Failed to scrape {url}: {str(e)}")
+        return None, None, False
+
+# Crawl the website with a pool of workers. Each page is appended to
+# <pages_path>.partial as soon as it is parsed, and the frontier/visited set
+# is checkpointed every `checkpoint_every` pages so an interrupted crawl can
+# resume. On completion the partial file replaces pages_path, which is also
+# the incremental state for the next crawl.
+def crawl(base=None, starts=None, page_limit=None, workers=default_workers, rate=default_rate,
+          burst=default_burst, pages_path=pages_file, use_selenium=False, html_dir=None,
+          resume=False, checkpoint_every=checkpoint_interval):
+    base = base or base_url
+    page_limit = page_limit or max_pages
+    if html_dir:
+        os.makedirs(html_dir, exist_ok=True)
+    limiter = HostRateLimiter(rate, burst)
+    previous = PageArchive(pages_path)
+    partial_path = f"{pages_path}.partial"
+    checkpoint_path = f"{pages_path}.checkpoint"
+
+    frontier = deque()
+    queued = set()   # Everything ever queued (frontier + in flight + done)
+    done = set()
+    stats = {'fetched': 0, 'unchanged': 0, 'failed': 0}
+
+    def enqueue(link):
+        full_url = normalize_url(link, base)
+        if full_url not in queued and is_valid_url(full_url, base):
+            queued.add(full_url)
+            frontier.append(full_url)
+
+    checkpoint = load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint and os.path.exists(partial_path):
+        frontier.extend(checkpoint['frontier'])
+        queued.update(checkpoint['queued'])
+        done.update(checkpoint['done'])
+        stats.update(checkpoint['stats'])
+        # Pages written after the last checkpoint are kept; a torn final
+        # line (crash mid-write) is cut off
+        replayed = set()
+        with open(partial_path, 'rb') as f:
+            end = checkpoint['offset']
+            for offset, record in iter_records(f, end):
+                done.add(record['url'])
+                replayed.add(record['url'])
+                stats['fetched' if record.get('changed', True) else 'unchanged'] += 1
+                for link in record['page']['links']:
+                    enqueue(link)
+                end = f.tell()
+        if replayed:
+            # One pass instead of a deque scan per replayed page
+            pending = [url for url in frontier if url not in replayed]
+            frontier.clear()
+            frontier.extend(pending)
+        out = open(partial_path, 'r+b')
+        out.truncate(end)
+        out.seek(end)
+        logging.info(f"Resuming crawl: {len(done)} pages done, {len(frontier)} queued")
+    else:
+        out = open(partial_path, 'wb')
+        for path in starts or start_urls:
+            enqueue(path)
+
+    def write_checkpoint(in_flight_urls):
+        out.flush()
+        os.fsync(out.fileno())
+        save_checkpoint(checkpoint_path, {
+            'offset': out.tell(),
+            # In-flight pages are not on disk yet, so they go back on the frontier
+            'frontier': list(in_flight_urls) + list(frontier),
+            'queued': list(queued),
+            'done': list(done),
+            'stats': stats,
+        })
+
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            since_checkpoint = 0
+            while frontier or in_flight:
+                while (frontier and len(in_flight) < workers
+                       and stats['fetched'] + stats['unchanged'] + len(in_flight) < page_limit):
+                    full_url = frontier.popleft()
+                    logging.info(f"Scraping {full_url}")
+                    in_flight[pool.submit(crawl_page, full_url, previous.get(full_url), limiter,
+                                          use_selenium, base, html_dir)] = full_url
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    full_url = in_flight[future]
+                    page_data, validators, changed = future.result()
+                    del in_flight[future]
+                    done.add(full_url)
+                    if not page_data:
+                        stats['failed'] += 1
+                        continue
+                    stats['fetched' if changed else 'unchanged'] += 1
+                    record = {'url': full_url, 'validators': validators, 'changed': changed, 'page': page_data}
+                    out.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                    for link in page_data['links']:
+                        enqueue(link)
+                    since_checkpoint += 1
+                if since_checkpoint >= checkpoint_every:
+                    write_checkpoint(in_flight.values())
+                    since_checkpoint = 0
+    except BaseException:
+        write_checkpoint(in_flight.values())  # Unrecorded in-flight pages are retried on resume
+        raise
+    finally:
+        close_drivers()
+        previous.close()
+        out.close()
+
+    os.replace(partial_path, pages_path)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    logging.info(f"Crawled {stats['fetched'] + stats['unchanged']} pages: {stats['fetched']} fetched, "
+                 f"{stats['unchanged']} unchanged, {stats['failed']} failed")
+    return stats
+
+# Build the knowledge file from crawl records without loading them all:
+# products/services are deduplicated in a first pass, pages streamed in a
+# second. Output matches json.dump(..., indent=2); a page crawled twice
+# (resumed crawl) keeps its last record.
+def compact(pages_path=pages_file, output_path=output_file):
+    last = {}
+    with open(pages_path, 'rb') as f:
+        for offset, record in iter_records(f):
+            last[record['url']] = offset
+
+        def unique_items(key):
+            seen = set()
+            for offset in last.values():
+                f.seek(offset)
+                for item in json.loads(f.readline())['page'][key]:
+                    marker = json.dumps(item, sort_keys=True)
+                    if marker not in seen:
+                        seen.add(marker)
+                        yield item
+
+        def block(value, indent):
+            text = json.dumps(value, indent=2, ensure_ascii=False)
+            return text.replace('\n', '\n' + ' ' * indent)
+
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write('{')
+            for n, key in enumerate(['products', 'services']):
+                out.write(',' if n else '')
+                out.write(f'\n  "{key}": [')
+                count = 0
+                for item in unique_items(key):
+                    out.write((',' if count else '') + '\n    ' + block(item, 4))
+                    count += 1
+                out.write('\n  ]' if count else ']')
+            out.write(',\n  "pages": {')
+            count = 0
+            for url, offset in last.items():
+                f.seek(offset)
+                page = json.loads(f.readline())['page']
+                entry = {
+                    'title': page['title'],
+                    'meta_description': page['meta_description'],
+                    'category': page['category'],
+                    'sections': page['sections'],
+                    'contact': page.get('contact', {}),
+                    'links': page['links']
+                }
+                out.write((',' if count else '') + '\n    ' + json.dumps(url, ensure_ascii=False) + ': ' + block(entry, 4))
+                count += 1
+            out.write('\n  }' if count else '}')
+            out.write('\n}')
+        os.replace(tmp_path, output_path)
+    return len(last)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl ubiksolution.com into ubik_data.json")
+    parser.add_argument('--base-url', default=base_url)
+    parser.add_argument('--max-pages', type=int, default=max_pages)
+    parser.add_argument('--workers', type=int, default=default_workers)
+    parser.add_argument('--rate', type=float, default=default_rate, help="Requests per second per host")
+    parser.add_argument('--pages', default=pages_file, help="Per-page JSONL records (also incremental re-crawl state)")
+    parser.add_argument('--output', default=output_file, help="Knowledge file written by compaction")
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted crawl from its checkpoint")
+    parser.add_argument('--compact-only', action='store_true', help="Skip crawling, only rebuild --output from --pages")
+    parser.add_argument('--selenium', action='store_true', help="Render pages with headless Chrome")
+    parser.add_argument('--save-html', default=None, help="Directory to save raw fetched pages into")
+    args = parser.parse_args()
+
+    if not args.compact_only:
+        crawl(args.base_url, start_urls, args.max_pages, args.workers, args.rate, pages_path=args.pages,
+              use_selenium=args.selenium, html_dir=args.save_html, resume=args.resume)
 
-logging.info(f"Scraping complete. Data saved to ubik_all_data.json")
\ No newline at end of file
+    pages = compact(args.pages, args.output)
+    logging.info(f"Scraping complete. {pages} pages compacted into {args.output}")
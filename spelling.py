@@ -0,0 +1,182 @@
+import re
+from functools import lru_cache
+
+from catalog import GENERIC_NAME_WORDS, STOPWORDS
+
+# -------------------------
+# Spell correction
+#
+# One compiled, case-insensitive, word-bounded pass over the message:
+# explicit corrections are replaced directly, other unknown words are
+# looked up SymSpell-style (precomputed deletes) against a vocabulary of
+# distinctive product and brand words from the knowledge files. Category
+# names and everyday words are left out of it, plurals are never treated
+# as typos, and a correction keeps the casing the user typed.
+# -------------------------
+
+WORD_RE = re.compile(r"[^\W\d_]+")
+# Subtrees whose names/categories feed the fuzzy vocabulary
+CATALOG_KEYS = ['products', 'divisions', 'subsidiaries', 'product_categories']
+NAME_KEYS = ['name']
+CATEGORY_KEYS = ['category', 'categories']
+MIN_FUZZY_LENGTH = 5
+# Everyday words in product and company names ("Hair Mask", "360 Block",
+# "My Derma Store"); like catalog.GENERIC_NAME_WORDS they say nothing
+# about which brand is meant, and as fuzzy targets they would rewrite
+# ordinary English ("black" -> "Block", "story" -> "Store")
+COMMON_NAME_WORDS = frozenset(
+    "acid aging block brand cleanser color conditioner export kit mask moisturizing nourishing pharma remedies "
+    "repair screen shampoo sheer solutions store academy topical whitening".split()
+)
+
+
+def _strings(obj):
+    if isinstance(obj, dict):
+        for v in obj.values():
+            yield from _strings(v)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _strings(item)
+    elif isinstance(obj, str):
+        yield obj
+
+
+def catalog_names(*datasets):
+    # -> (product, brand, division names; category names)
+    names, categories = [], []
+
+    def _collect(obj, category_level=False):
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                if k in CATEGORY_KEYS or (category_level and k in NAME_KEYS):
+                    categories.extend(_strings(v))
+                elif k in NAME_KEYS:
+                    names.extend(_strings(v))
+                else:
+                    _collect(v)
+        elif isinstance(obj, list):
+            for item in obj:
+                _collect(item, category_level)
+
+    for data in datasets:
+        for key in CATALOG_KEYS:
+            if isinstance(data, dict) and key in data:
+                # product_categories: [{"name": <category>, "products": [...]}, ...]
+                _collect(data[key], category_level=key == 'product_categories')
+    return names, categories
+
+
+def known_words(*datasets):
+    # Every word that appears anywhere in the knowledge files is left alone
+    words = set()
+    for data in datasets:
+        for text in _strings(data):
+            words.update(w.lower() for w in WORD_RE.findall(text))
+    return words
+
+
+def _deletes(word, distance):
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a, b, limit):
+    # Optimal string alignment distance, early exit once every cell exceeds limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def max_distance(word):
+    return 1 if len(word) < 8 else 2
+
+
+def plural_pair(a, b):
+    # "masks"/"mask", "brushes"/"brush": a plural is not a typo
+    return a in (b + 's', b + 'es') or b in (a + 's', a + 'es')
+
+
+def match_case(word, like):
+    # `word` in the casing the user typed `like` in
+    if like.islower():
+        return word.lower()
+    if like.isupper():
+        return word.upper()
+    if word.islower() or word.isupper():
+        return word.capitalize()
+    return word
+
+
+class SpellCorrector:
+    def __init__(self, corrections, names=(), known=(), generic=()):
+        # names: product/brand names; generic: category names and other
+        # words that are never fuzzy targets (only distinctive brand and
+        # product tokens are, the way catalog.name_postings picks them)
+        self.corrections = {' '.join(k.lower().split()): v for k, v in corrections.items()}
+        excluded = GENERIC_NAME_WORDS | STOPWORDS | COMMON_NAME_WORDS
+        excluded |= {word.lower() for name in generic for word in WORD_RE.findall(name)}
+        # Canonical spelling of each vocabulary word (first seen wins)
+        self.vocabulary = {}
+        for name in list(names) + list(corrections.values()):
+            for word in WORD_RE.findall(name):
+                if len(word) >= MIN_FUZZY_LENGTH - 1 and word.lower() not in excluded:
+                    self.vocabulary.setdefault(word.lower(), word)
+        self.known = set(known) | set(self.vocabulary)
+
+        self.deletes = {}
+        for word in self.vocabulary:
+            for variant in _deletes(word, max_distance(word)):
+                self.deletes.setdefault(variant, []).append(word)
+
+        fixed = sorted(self.corrections, key=len, reverse=True)
+        self.pattern = re.compile(
+            r"\b(?:(?P<fixed>" + "|".join(r"\s+".join(map(re.escape, k.split())) for k in fixed) + r")"
+            r"|(?P<word>[^\W\d_]{%d,}))\b" % MIN_FUZZY_LENGTH,
+            re.IGNORECASE,
+        )
+        self.lookup = lru_cache(maxsize=8192)(self._lookup)
+
+    def _lookup(self, word):
+        # Closest vocabulary word for an unknown word, or None
+        if word in self.known:
+            return None
+        limit = max_distance(word)
+        candidates = set()
+        for variant in _deletes(word, limit):
+            candidates.update(self.deletes.get(variant, ()))
+        best, best_distance = None, limit + 1
+        for candidate in candidates:
+            if plural_pair(word, candidate):
+                continue
+            distance = edit_distance(word, candidate, limit)
+            if distance > limit:
+                continue
+            if distance < best_distance or (distance == best_distance and candidate < best):
+                best, best_distance = candidate, distance
+        return self.vocabulary[best] if best is not None else None
+
+    def _replace(self, match):
+        if match.group('fixed'):
+            return self.corrections[' '.join(match.group('fixed').lower().split())]
+        word = match.group('word')
+        corrected = self.lookup(word.lower())
+        return match_case(corrected, word) if corrected else word
+
+    def correct(self, text):
+        return self.pattern.sub(self._replace, text)
@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:  # gzip variants only
+    brotli = None
+
+# -------------------------
+# Static asset pipeline
+#
+# Build step: content-hash every file under static/, rewrite /static/...
+# references in HTML/CSS/JS to the fingerprinted names, write gzip/brotli
+# variants and a manifest. At runtime the manifest is loaded into an
+# in-memory table, so serving a file needs no filesystem stat and
+# fingerprinted URLs can be cached forever.
+#
+#   python static_assets.py   (also runs automatically at startup if stale)
+# -------------------------
+
+mimetypes.add_type('model/gltf-binary', '.glb')
+mimetypes.add_type('model/gltf+json', '.gltf')
+
+REWRITE_EXTENSIONS = ('.css', '.js', '.html')  # In dependency order
+COMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg', '.txt', '.xml', '.glb', '.gltf', '.wasm')
+REF_RE = re.compile(r'''(["'(])(/?static/)([^"'()?#\s]+)''')
+MEMORY_LIMIT = 128 * 1024  # Page/image variants up to this size are kept in memory
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+def _source_files(static_dir):
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_dir).replace(os.sep, '/'), path
+
+
+def source_fingerprint(static_dir):
+    digest = hashlib.sha256()
+    for rel, path in sorted(_source_files(static_dir)):
+        stat = os.stat(path)
+        digest.update(f"{rel}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    digest.update(str(brotli is not None).encode())
+    return digest.hexdigest()
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _hashed_name(rel, digest):
+    base, ext = os.path.splitext(rel)
+    return f"{base}.{digest[:10]}{ext}"
+
+
+def build_manifest(static_dir='static', build_dir='static_build'):
+    files = dict(_source_files(static_dir))
+    order = sorted(files, key=lambda rel: (
+        REWRITE_EXTENSIONS.index(os.path.splitext(rel)[1]) + 1
+        if os.path.splitext(rel)[1] in REWRITE_EXTENSIONS else 0, rel))
+    hashed = {}
+    assets = {}
+    for rel in order:
+        ext = os.path.splitext(rel)[1].lower()
+        with open(files[rel], 'rb') as f:
+            data = f.read()
+        identity = files[rel]
+        if ext in REWRITE_EXTENSIONS:
+            text = data.decode('utf-8')
+            rewritten = REF_RE.sub(
+                lambda m: m.group(1) + '/static/' + hashed[m.group(3)] if m.group(3) in hashed else m.group(0),
+                text,
+            )
+            if rewritten != text:
+                data = rewritten.encode('utf-8')
+                identity = os.path.join(build_dir, rel)
+                _write(identity, data)
+        digest = hashlib.sha256(data).hexdigest()
+        hashed[rel] = _hashed_name(rel, digest)
+        entry = {
+            'hashed': hashed[rel],
+            'etag': digest[:32],
+            'mimetype': mimetypes.guess_type(rel)[0] or 'application/octet-stream',
+            'files': {'identity': [identity, len(data)]},
+        }
+        if ext in COMPRESS_EXTENSIONS:
+            variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['br'] = brotli.compress(data, quality=11)
+            for encoding, compressed in variants.items():
+                # Only worth serving if it saves at least 10%
+                if len(compressed) < len(data) * 0.9:
+                    path = os.path.join(build_dir, f"{rel}.{'gz' if encoding == 'gzip' else encoding}")
+                    _write(path, compressed)
+                    entry['files'][encoding] = [path, len(compressed)]
+        assets[rel] = entry
+
+    manifest = {'source': source_fingerprint(static_dir), 'assets': assets}
+    _write(os.path.join(build_dir, 'manifest.json'), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def load_or_build(static_dir='static', build_dir='static_build'):
+    try:
+        with open(os.path.join(build_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('source') == source_fingerprint(static_dir):
+            return manifest
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return build_manifest(static_dir, build_dir)
+
+
+class AssetTable:
+    def __init__(self, manifest):
+        self.table = {}
+        for rel, entry in manifest['assets'].items():
+            variants = {}
+            in_memory = entry['mimetype'].startswith(('text/', 'image/', 'application/javascript'))
+            for encoding, (path, size) in entry['files'].items():
+                body = None
+                if in_memory and size <= MEMORY_LIMIT:
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                variants[encoding] = (path, size, body)
+            asset = {'etag': entry['etag'], 'mimetype': entry['mimetype'], 'variants': variants}
+            self.table[rel] = (asset, REVALIDATE)
+            self.table[entry['hashed']] = (asset, IMMUTABLE)
+        # Logical name -> fingerprinted name, e.g. for templates
+        self.urls = {rel: entry['hashed'] for rel, entry in manifest['assets'].items()}
+
+    def __contains__(self, path):
+        return path in self.table
+
+    def _read(self, path, chunk_size=65536):
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def send(self, path, request, response_class):
+        # Returns a response for a known asset, or None
+        hit = self.table.get(path)
+        if hit is None:
+            return None
+        asset, cache_control = hit
+        variants = asset['variants']
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        etag = asset['etag'] if encoding == 'identity' else f"{asset['etag']}-{encoding}"
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        if request.if_none_match.contains(etag):
+            return response_class(status=304, headers=headers)
+
+        file_path, size, body = variants[encoding]
+        headers['Content-Length'] = str(size)
+        return response_class(body if body is not None else self._read(file_path),
+                              mimetype=asset['mimetype'], headers=headers)
+
+
+if __name__ == "__main__":
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else 'static'
+    build_dir = sys.argv[2] if len(sys.argv) > 2 else 'static_build'
+    manifest = build_manifest(static_dir, build_dir)
+    print(f"Built {len(manifest['assets'])} assets into {build_dir}")
@@ -0,0 +1,40 @@
+import json
+import re
+
+# -------------------------
+# Server-Sent Events helpers for streamed chat replies
+# -------------------------
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a line break
+SENTENCE_END_RE = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+ABBREVIATIONS = {'e.g.', 'i.e.', 'etc.', 'dr.', 'mr.', 'mrs.', 'ms.', 'pvt.', 'ltd.', 'no.', 'vs.'}
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class SentenceSplitter:
+    # Incrementally cuts streamed text into complete sentences (for TTS)
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_RE.finditer(self.buffer):
+            words = self.buffer[start:match.end()].split()
+            if words and words[-1].lower() in ABBREVIATIONS:
+                continue
+            sentence = self.buffer[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        sentence, self.buffer = self.buffer.strip(), ""
+        return [sentence] if sentence else []
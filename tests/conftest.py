@@ -0,0 +1,40 @@
+import os
+import socket
+import sys
+import tempfile
+
+# -------------------------
+# Tests that import the app get an offline configuration: model calls go
+# to a closed port, nothing runs in the background, and every file the
+# app writes (caches, quiz pool, metrics, built assets) lives in a
+# scratch directory instead of the repo.
+# -------------------------
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def _closed_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+SCRATCH = tempfile.mkdtemp(prefix='ubik-tests-')
+for name, value in {
+    'GOOGLE_API_KEY': 'test',
+    'GEMINI_API_ENDPOINT': f'http://127.0.0.1:{_closed_port()}',
+    'MODEL_WARMUP': '0',
+    'DEFER_BACKGROUND_TASKS': '1',
+    'KNOWLEDGE_RELOAD_INTERVAL': '0',
+    'ANSWER_CACHE_PATH': '',
+    'QUIZ_POOL_PATH': os.path.join(SCRATCH, 'question_pool.json'),
+    'METRICS_DIR': os.path.join(SCRATCH, 'metrics'),
+    'STATIC_BUILD_DIR': os.path.join(SCRATCH, 'static_build'),
+    'TTS_SYNTHESIZER': 'stub',
+    'TTS_CACHE_DIR': os.path.join(SCRATCH, 'tts_cache'),
+}.items():
+    os.environ.setdefault(name, value)
+# The app reads its knowledge files relative to the working directory
+os.chdir(REPO_ROOT)
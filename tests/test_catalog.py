@@ -0,0 +1,63 @@
+import json
+import os
+
+from catalog import ProductCatalog, normalize, parse_price
+
+# -------------------------
+# Catalog questions against ubik_product_details.json: filters are
+# checked against a direct scan of the JSON, and ingredient phrases the
+# catalog does not know fall back (None) instead of matching part of the
+# phrase.
+#
+#   python -m pytest -q tests
+# -------------------------
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+with open(os.path.join(REPO_ROOT, 'ubik_product_details.json'), 'r', encoding='utf-8') as f:
+    CATEGORIES = json.load(f)['product_categories']
+CATALOG = ProductCatalog(CATEGORIES)
+
+
+def products():
+    for category in CATEGORIES:
+        for product in category.get('products', []):
+            yield dict(product, category=product.get('category') or category.get('name', ''))
+
+
+def names(rows):
+    return sorted(CATALOG.names[row] for row in rows)
+
+
+def test_category_under_price():
+    for text in ("anti-acne products under ₹500", "anti acne products under rs 300", "Anti-Acne products below 500/-"):
+        query = CATALOG.parse(text)
+        limit = query['max_price']
+        assert query['category'] == 'Anti-Acne' and query['ingredient'] is None
+        expected = sorted(p['name'] for p in products() if p['category'] == 'Anti-Acne'
+                          and parse_price(p.get('price')) is not None and parse_price(p['price']) <= limit)
+        assert expected and names(CATALOG.execute(query)) == expected
+        assert CATALOG.answer(text).startswith(f"Anti-Acne products under ₹{limit:,.0f} ({len(expected)})")
+
+
+def test_products_containing_ingredient():
+    for text, ingredient in [("which products contain azelaic acid", "azelaic acid"),
+                             ("azelaic acid products", "azelaic acid"),
+                             ("products with salicylic acid", "salicylic acid")]:
+        query = CATALOG.parse(text)
+        assert query['ingredient'] == ingredient
+        expected = sorted(p['name'] for p in products() if f" {ingredient} " in f" {normalize(p.get('ingredients', ''))} ")
+        assert expected and names(CATALOG.execute(query)) == expected
+
+
+def test_unknown_ingredient_phrase_falls_back():
+    # Used to list every "acid" / "vitamin" product
+    for text in ("products with kojic acid", "which products contain kojic acid", "kojic acid products",
+                 "products containing vitamin c", "vitamin c products", "which products contain vitamin c"):
+        assert CATALOG.parse(text) is None
+        assert CATALOG.answer(text) is None
+
+
+def test_named_product_lookup():
+    query = CATALOG.parse("price of aczee serum")
+    assert query['field'] == 'price' and names(query['products']) == ["Aczee Serum 30 ML"]
+    assert CATALOG.answer("price of aczee serum") == "Aczee Serum 30 ML costs ₹1,350."
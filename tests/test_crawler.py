@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import scrape_ubik
+
+# -------------------------
+# The crawler against a local fixture site: a concurrent crawl, the
+# conditional (304) re-crawl, resuming after a crash mid-crawl (checkpoint
+# offset, torn last line, frontier rebuild) and compaction.
+#
+#   python -m pytest -q tests
+# -------------------------
+
+PAGES = 31  # index.html plus p0 .. p29, linked as a binary tree
+
+
+def page_html(n, title=None):
+    # p{n} links to p{2n+1} and p{2n+2}; the index (n=None) to p0
+    children = [0] if n is None else [c for c in (2 * n + 1, 2 * n + 2) if c < PAGES - 1]
+    links = ''.join(f'<a href="/p{c}.html">Page {c}</a>' for c in children)
+    n = 0 if n is None else n
+    return (
+        f'<html><head><title>{title or f"Page {n}"} - Ubik</title><meta name="description" content="Fixture page {n}"></head><body>'
+        f'<nav class="menu"><a href="/index.html">Home</a><a href="mailto:care@example.com">Mail</a></nav>'
+        f'<ul class="products"><li class="product"><h2 class="woocommerce-loop-product__title">Product {n % 7} Gel</h2>'
+        f'<span class="price">&#8377;{100 + n % 7}</span></li></ul>'
+        f'<section class="service-block"><h3>Service {n % 3}</h3><p>About service {n % 3}.</p></section>'
+        f'{links}'
+        f'<footer class="site-footer info"><p>Call +91 9512355550</p></footer></body></html>'
+    )
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+            if self.headers.get('If-Modified-Since'):
+                server.conditional += 1
+        try:
+            time.sleep(0.02)  # Long enough for requests to overlap
+            super().do_GET()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / 'site'
+    root.mkdir()
+    (root / 'index.html').write_text(page_html(None, 'Home'), encoding='utf-8')
+    for n in range(PAGES - 1):
+        (root / f'p{n}.html').write_text(page_html(n), encoding='utf-8')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(FixtureHandler, directory=str(root)))
+    server.lock = threading.Lock()
+    server.in_flight = server.peak = server.conditional = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base = f'http://127.0.0.1:{server.server_address[1]}'
+    server.root = root
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_crawl(site, pages_path, **kwargs):
+    kwargs.setdefault('workers', 8)
+    return scrape_ubik.crawl(site.base, ['/index.html'], 100, rate=1000, pages_path=str(pages_path), **kwargs)
+
+
+def read_records(path):
+    with open(path, 'rb') as f:
+        return [record for _, record in scrape_ubik.iter_records(f)]
+
+
+def reference_compaction(records):
+    # What the crawler wrote before compaction was streamed: one dict, json.dump'ed
+    data = {'products': [], 'services': [], 'pages': {}}
+    seen = {'products': set(), 'services': set()}
+    for record in records:
+        page = record['page']
+        for key in ('products', 'services'):
+            for item in page[key]:
+                marker = json.dumps(item, sort_keys=True)
+                if marker not in seen[key]:
+                    seen[key].add(marker)
+                    data[key].append(item)
+        data['pages'][record['url']] = {
+            'title': page['title'], 'meta_description': page['meta_description'], 'category': page['category'],
+            'sections': page['sections'], 'contact': page.get('contact', {}), 'links': page['links'],
+        }
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def test_concurrent_crawl(site, tmp_path):
+    pages_path = tmp_path / 'pages.jsonl'
+    stats = run_crawl(site, pages_path)
+    assert stats == {'fetched': PAGES, 'unchanged': 0, 'failed': 0}
+    urls = [record['url'] for record in read_records(pages_path)]
+    assert len(urls) == len(set(urls)) == PAGES
+    assert site.peak > 1
+    assert not os.path.exists(f'{pages_path}.partial')
+    assert not os.path.exists(f'{pages_path}.checkpoint')
+
+
+def test_recrawl_uses_conditional_requests(site, tmp_path):
+    pages_path = tmp_path / 'pages.jsonl'
+    run_crawl(site, pages_path)
+    first = {record['url']: record['page'] for record in read_records(pages_path)}
+
+    stats = run_crawl(site, pages_path)
+    assert stats == {'fetched': 0, 'unchanged': PAGES, 'failed': 0}
+    assert site.conditional == PAGES
+    assert {record['url']: record['page'] for record in read_records(pages_path)} == first
+
+    # A changed page is fetched again, the rest stay 304
+    changed = site.root / 'p5.html'
+    changed.write_text(page_html(5, 'Page five'), encoding='utf-8')
+    later = time.time() + 10
+    os.utime(changed, (later, later))
+    stats = run_crawl(site, pages_path)
+    assert stats == {'fetched': 1, 'unchanged': PAGES - 1, 'failed': 0}
+    titles = {record['url']: record['page']['title'] for record in read_records(pages_path)}
+    assert titles[f'{site.base}/p5.html'].startswith('Page five')
+
+
+def test_resume_after_exception(site, tmp_path, monkeypatch):
+    full_path = tmp_path / 'full.jsonl'
+    run_crawl(site, full_path)
+
+    pages_path = tmp_path / 'pages.jsonl'
+    crawl_page, save_checkpoint = scrape_ubik.crawl_page, scrape_ubik.save_checkpoint
+    calls = []
+
+    def crash_mid_crawl(*args, **kwargs):
+        calls.append(args[0])
+        if len(calls) == 13:
+            raise KeyboardInterrupt
+        return crawl_page(*args, **kwargs)
+
+    def killed_before_checkpoint(path, checkpoint):
+        # A hard kill: the checkpoint written on the way out never happens,
+        # so pages after the last periodic one must be replayed
+        if len(calls) < 13:
+            save_checkpoint(path, checkpoint)
+
+    monkeypatch.setattr(scrape_ubik, 'crawl_page', crash_mid_crawl)
+    monkeypatch.setattr(scrape_ubik, 'save_checkpoint', killed_before_checkpoint)
+    with pytest.raises(KeyboardInterrupt):
+        # One worker: 12 pages written, the last checkpoint after 10
+        run_crawl(site, pages_path, workers=1, checkpoint_every=5)
+    partial_path = f'{pages_path}.partial'
+    checkpoint = scrape_ubik.load_checkpoint(f'{pages_path}.checkpoint')
+    written = len(read_records(partial_path))
+    assert (len(checkpoint['done']), written) == (10, 12)
+    # Killed halfway through writing a record
+    with open(partial_path, 'ab') as f:
+        f.write(b'{"url": "torn')
+
+    monkeypatch.setattr(scrape_ubik, 'crawl_page', crawl_page)
+    monkeypatch.setattr(scrape_ubik, 'save_checkpoint', save_checkpoint)
+    stats = run_crawl(site, pages_path, resume=True)
+    assert stats['fetched'] + stats['unchanged'] == PAGES and stats['failed'] == 0
+    urls = [record['url'] for record in read_records(pages_path)]
+    assert len(urls) == len(set(urls)) == PAGES
+    assert set(urls) == {record['url'] for record in read_records(full_path)}
+    assert not os.path.exists(partial_path)
+    assert not os.path.exists(f'{pages_path}.checkpoint')
+
+
+def test_compact_output(site, tmp_path):
+    pages_path = tmp_path / 'pages.jsonl'
+    output_path = tmp_path / 'ubik_data.json'
+    run_crawl(site, pages_path)
+    records = read_records(pages_path)
+    assert scrape_ubik.compact(str(pages_path), str(output_path)) == PAGES
+    assert output_path.read_text(encoding='utf-8') == reference_compaction(records)
+
+    # A page recorded twice (resumed crawl) keeps its last record
+    again = dict(records[3], page=dict(records[3]['page'], title='Recrawled'))
+    with open(pages_path, 'ab') as f:
+        f.write((json.dumps(again, ensure_ascii=False) + '\n').encode('utf-8'))
+    assert scrape_ubik.compact(str(pages_path), str(output_path)) == PAGES
+    assert output_path.read_text(encoding='utf-8') == reference_compaction(records + [again])
+    assert json.loads(output_path.read_text(encoding='utf-8'))['pages'][again['url']]['title'] == 'Recrawled'
@@ -0,0 +1,24 @@
+import app
+
+# -------------------------
+# /api/evaluate/batch input checks (nothing here reaches the model)
+#
+#   python -m pytest -q tests
+# -------------------------
+
+
+def post_batch(body):
+    return app.app.test_client().post('/api/evaluate/batch', json=body)
+
+
+def test_batch_must_be_a_list():
+    response = post_batch({'answers': 'not a list'})
+    assert response.status_code == 400
+
+
+def test_oversized_batch_is_rejected():
+    items = [{'question': f'unknown question {i}', 'answer': 'x'} for i in range(app.EVALUATE_BATCH_MAX + 1)]
+    for body in (items, {'answers': items}):
+        response = post_batch(body)
+        assert response.status_code == 400
+        assert str(app.EVALUATE_BATCH_MAX) in response.get_json()['error']
@@ -0,0 +1,77 @@
+import os
+import random
+import sys
+
+# -------------------------
+# Parity: KnowledgeIndex.search / ranked must return exactly what the
+# recursive search_json and the original relevance sort return (same
+# matches, same order, same tie-breaking), over the knowledge vocabulary
+# plus random substrings of the knowledge text.
+#
+#   python -m pytest -q tests
+# -------------------------
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from knowledge_index import KnowledgeIndex, search_json  # noqa: E402
+from knowledge_store import load_knowledge  # noqa: E402
+
+KNOWLEDGE_FILES = [os.path.join(REPO_ROOT, name) for name in ('ubik_data.json', 'ubik_product_details.json')]
+# Structure characters, padding and case that take the exact slow path
+EDGE_QUERIES = ["", " ", "acne", "ACNE", " acne", "acne ", "'", '"', ":", ", ", "': '", "[", "]", "{", "}",
+                "\\", "description", "name", "address", "ubik", "₹", "100", "0.5"]
+
+
+def reference_ranked(data, query, max_items=None):
+    # generate_answer_from_json's original ranking over search_json
+    matches = search_json(data, query)
+
+    def relevance_score(match):
+        score = match['priority']
+        if query.lower() in str(match['value']).lower():
+            score += 1.0
+        score += match['path'].count('.') * 0.5
+        if not match['path']:
+            score -= 1.0
+        return score
+
+    matches.sort(key=relevance_score, reverse=True)
+    return matches[:max_items]
+
+
+def corpus(index, data, size=2000, seed=11):
+    rng = random.Random(seed)
+    queries = list(EDGE_QUERIES)
+    vocabulary = sorted(index.vocabulary)
+    queries += rng.sample(vocabulary, min(len(vocabulary), size // 2))
+    text = str(data)
+    while len(queries) < size:
+        start = rng.randrange(len(text))
+        queries.append(text[start:start + rng.randint(1, 24)])
+    return queries
+
+
+def _setup():
+    data = load_knowledge(KNOWLEDGE_FILES)
+    index = KnowledgeIndex(data)
+    return data, index, corpus(index, data)
+
+
+DATA, INDEX, QUERIES = _setup()
+
+
+def test_search_matches_search_json():
+    mismatches = [q for q in QUERIES if INDEX.search(q) != search_json(DATA, q)]
+    assert not mismatches, f"{len(mismatches)} queries differ, e.g. {mismatches[:5]!r}"
+
+
+def test_ranked_matches_relevance_sort():
+    mismatches = [q for q in QUERIES if INDEX.ranked(q) != reference_ranked(DATA, q)]
+    assert not mismatches, f"{len(mismatches)} queries differ, e.g. {mismatches[:5]!r}"
+
+
+def test_ranked_top_items():
+    for query in QUERIES[:200]:
+        assert INDEX.ranked(query, 3) == reference_ranked(DATA, query, 3)
@@ -0,0 +1,39 @@
+import app
+from knowledge_store import KnowledgeSnapshot
+
+# -------------------------
+# A request keeps the knowledge snapshot it started with, even when a
+# reload publishes a new one halfway through.
+#
+#   python -m pytest -q tests
+# -------------------------
+
+
+def test_request_keeps_its_snapshot(monkeypatch):
+    pinned = app.knowledge_store.current
+    with app.app.test_request_context('/api/chat', method='POST'):
+        app.app.preprocess_request()
+        newer = KnowledgeSnapshot(pinned.version + 1, 'newer', pinned.data, app.knowledge_store.build(pinned.data))
+        monkeypatch.setattr(app.knowledge_store, 'current', newer)
+        assert app.request_knowledge() is pinned
+        assert app.knowledge_store.current is not pinned
+    # Outside a request, the latest snapshot
+    assert app.request_knowledge() is app.knowledge_store.current
+
+
+def test_chat_during_reload(monkeypatch):
+    # Every stage of a chat request reads the same snapshot
+    seen = []
+    original = app.request_knowledge
+
+    def recording():
+        knowledge = original()
+        seen.append(knowledge)
+        # A reload lands right after the first read
+        app.knowledge_store.reload(force=True)
+        return knowledge
+
+    monkeypatch.setattr(app, 'request_knowledge', recording)
+    response = app.app.test_client().post('/api/chat', json={'message': 'price of aczee serum'})
+    assert response.status_code == 200
+    assert seen and all(knowledge is seen[0] for knowledge in seen)
@@ -0,0 +1,72 @@
+import json
+
+from question_pool import QuestionPool
+
+# -------------------------
+# Reference answers are tied to the knowledge version they were computed
+# from: a reload makes them stale, and the refill regenerates them.
+#
+#   python -m pytest -q tests
+# -------------------------
+
+
+def make_pool(path, version, answers):
+    # answers: the "model", {question: answer}; calls are recorded
+    calls = []
+
+    def answer_question(question):
+        calls.append(question)
+        return answers.get(question)
+
+    pool = QuestionPool(str(path), lambda n: [], answer_question, target_size=0, version=version)
+    return pool, calls
+
+
+def test_reload_makes_reference_answers_stale(tmp_path):
+    path = tmp_path / 'pool.json'
+    pool, calls = make_pool(path, 'v1', {'What is UBIK?': 'old answer'})
+    pool.add(['What is UBIK?'])
+    pool.refill_once()
+    assert pool.reference_answer('What is UBIK?') == 'old answer'
+
+    pool.set_version('v2')
+    assert pool.reference_answer('What is UBIK?') is None
+    pool.answer_question = lambda question: calls.append(question) or 'new answer'
+    pool.refill_once()
+    assert pool.reference_answer('What is UBIK?') == 'new answer'
+    assert calls == ['What is UBIK?', 'What is UBIK?']
+
+
+def test_persisted_answers_keep_their_version(tmp_path):
+    path = tmp_path / 'pool.json'
+    pool, _ = make_pool(path, 'v1', {'What is UBIK?': 'old answer'})
+    pool.add(['What is UBIK?'])
+    pool.refill_once()
+    with open(path, 'r', encoding='utf-8') as f:
+        assert json.load(f) == [{'question': 'What is UBIK?', 'answer': 'old answer', 'knowledge': 'v1'}]
+
+    # A worker or restart on newer knowledge does not serve the old answer
+    restarted, calls = make_pool(path, 'v2', {'What is UBIK?': 'new answer'})
+    assert restarted.reference_answer('What is UBIK?') is None
+    restarted.refill_once()
+    assert restarted.reference_answer('What is UBIK?') == 'new answer'
+    assert calls == ['What is UBIK?']
+
+    # The older worker picks the fresher answer up from disk only once it reloads too
+    pool.load()
+    assert pool.reference_answer('What is UBIK?') == 'old answer'
+    pool.set_version('v2')
+    pool.load()
+    assert pool.reference_answer('What is UBIK?') == 'new answer'
+
+
+def test_untagged_answers_are_regenerated(tmp_path):
+    # Pool files written before answers carried a version
+    path = tmp_path / 'pool.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{'question': 'What is UBIK?', 'answer': 'legacy answer'}], f)
+    pool, calls = make_pool(path, 'v1', {'What is UBIK?': 'answer'})
+    assert pool.reference_answer('What is UBIK?') is None
+    pool.refill_once()
+    assert pool.reference_answer('What is UBIK?') == 'answer'
+    assert calls == ['What is UBIK?']
@@ -0,0 +1,49 @@
+import app
+
+# -------------------------
+# Spell correction: brand typos are fixed, ordinary English is not
+# rewritten onto product or category words.
+#
+#   python -m pytest -q tests
+# -------------------------
+
+COMMON_WORDS = [
+    "condition", "black", "story", "sheet", "masks", "cheer", "whats", "scream", "brands", "stores",
+    "expert", "blocks", "cream", "creams", "hairs", "screen", "sheer", "shampoos", "colors", "repairs",
+    "acids", "aging", "remedy", "pharmacy", "storage", "export", "exports", "academic", "solutions",
+    "products", "careful", "healthy", "special", "treat", "trend", "happy", "hello", "thanks",
+]
+TYPOS = {
+    "aczeee serum": "aczee serum",
+    "Trichoexto shampoo": "TrichoExito shampoo",
+    "benzonex gel": "benzonext gel",
+    "Hydrofill cream": "Hydrofil cream",
+    "niacinamde": "niacinamide",
+    "salicilic acid": "salicylic acid",
+    "technolgy": "technology",
+    "ubeek products": "UBIK products",
+    "wat is ubik": "what is ubik",
+}
+
+
+def test_common_words_unchanged():
+    for word in COMMON_WORDS:
+        for text in (word, word.capitalize(), word.upper(), f"tell me about {word} please"):
+            assert app.correct_spelling(text) == text
+
+
+def test_reported_sentences_unchanged():
+    for text in ["my skin condition is bad", "do you have a black soap", "tell me the story of ubik",
+                 "sheet masks", "cheer up", "whats new", "scream"]:
+        assert app.correct_spelling(text) == text
+
+
+def test_brand_typos_corrected():
+    for text, expected in TYPOS.items():
+        assert app.correct_spelling(text) == expected
+
+
+def test_correction_keeps_user_casing():
+    assert app.correct_spelling("SEBONAI") == "SEBONIA"
+    assert app.correct_spelling("Sebonai") == "Sebonia"
+    assert app.correct_spelling("sebonai") == "sebonia"
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import threading
+import time
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: runs are only exclusive per process
+    fcntl = None
+
+# -------------------------
+# Server-side text-to-speech with a content-addressed audio cache
+#
+# Audio is stored as <sha256(voice, model, text)>.mp3, so the same sentence
+# is synthesized once no matter how often (or by which worker) it is asked
+# for. The directory is capped by total size, evicting least recently used
+# files (hits bump the file mtime).
+# -------------------------
+
+ELEVENLABS_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
+
+
+class ElevenLabsSynthesizer:
+    def __init__(self, api_key, timeout=30):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def synthesize(self, text, voice_id, model_id):
+        # Yields mp3 chunks as ElevenLabs produces them
+        response = self.session.post(
+            ELEVENLABS_URL.format(voice_id=voice_id),
+            headers={'xi-api-key': self.api_key, 'Content-Type': 'application/json', 'Accept': 'audio/mpeg'},
+            json={
+                'text': text,
+                'model_id': model_id,
+                'voice_settings': {'stability': 0.5, 'similarity_boost': 0.75}
+            },
+            stream=True,
+            timeout=self.timeout,
+        )
+        with response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=16384):
+                if chunk:
+                    yield chunk
+
+
+class StubSynthesizer:
+    # Offline stand-in (TTS_SYNTHESIZER=stub): deterministic bytes, no network
+    def __init__(self, chunk_size=1024, delay=0.0):
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.calls = 0
+
+    def synthesize(self, text, voice_id, model_id):
+        self.calls += 1
+        payload = b"ID3" + f"{voice_id}|{model_id}|{text}".encode('utf-8') * 4
+        for start in range(0, len(payload), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            yield payload[start:start + self.chunk_size]
+
+
+def audio_key(text, voice_id, model_id):
+    return hashlib.sha256(f"{voice_id}\0{model_id}\0{text}".encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, directory, synthesizer, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.synthesizer = synthesizer
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._scan())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _scan(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.mp3') and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _read(self, path, chunk_size=16384):
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def _synthesize_to_file(self, key, text, voice_id, model_id):
+        # Relays chunks to the caller while writing them; the file only
+        # becomes visible once complete
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in self.synthesizer.synthesize(text, voice_id, model_id):
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        with self._lock:
+            self.total_bytes += size
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def lookup(self, text, voice_id, model_id):
+        # Returns (key, hit, chunk iterator)
+        key = audio_key(text, voice_id, model_id)
+        path = self._path(key)
+        try:
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            self.counters['misses'] += 1
+            return key, False, self._synthesize_to_file(key, text, voice_id, model_id)
+        self.counters['hits'] += 1
+        return key, True, self._read(path)
+
+    def try_lock_presynthesis(self):
+        # Non-blocking; one run across all workers (lock file). Returns a
+        # handle for unlock_presynthesis, or None while a run is in progress
+        if not self._run_lock.acquire(blocking=False):
+            return None
+        if fcntl is None:
+            return self._run_lock
+        lock_file = open(os.path.join(self.directory, 'presynthesize.lock'), 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            self._run_lock.release()
+            return None
+        return lock_file
+
+    def unlock_presynthesis(self, handle):
+        if handle is not self._run_lock:
+            handle.close()  # Releases the flock
+        self._run_lock.release()
+
+    def presynthesize(self, texts, voice_id, model_id):
+        # Fills the cache ahead of time (e.g. for every quiz question)
+        created = 0
+        for text in texts:
+            key, hit, chunks = self.lookup(text, voice_id, model_id)
+            if not hit:
+                for _ in chunks:
+                    pass
+                created += 1
+        return created
+
+    def evict(self):
+        with self._lock:
+            entries = sorted(self._scan())
+            total = sum(size for _, _, size in entries)
+            for _, path, size in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.counters['evictions'] += 1
+            self.total_bytes = total
+
+    def stats(self):
+        return {**self.counters, 'bytes': self.total_bytes, 'max_bytes': self.max_bytes}